@@ -1,11 +1,15 @@
 import os
 import json
 import time
+import fcntl
+import pickle
+import contextlib
+import random
 import datetime
 import requests
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import ollama
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.embeddings import OllamaEmbeddings
@@ -14,19 +18,21 @@ from langchain.chains import ConversationalRetrievalChain
 from langchain.schema import Document
 from langchain.prompts import PromptTemplate
 from langchain.llms import Ollama
-import schedule
+import faiss
 import threading
 import logging
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("crypto_rag.log"),
-        logging.StreamHandler()
-    ]
-)
+# Setup logging once, leaving alone any handlers installed by an embedding
+# application (e.g. gunicorn) or a previous import.
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("crypto_rag.log"),
+            logging.StreamHandler()
+        ]
+    )
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -36,8 +42,100 @@ NEWS_API_URL = "https://newsapi.org/v2/everything"
 OLLAMA_MODEL = "llama3"  # or another model you have pulled in Ollama
 VECTOR_DB_PATH = "faiss_index"
 UPDATE_INTERVAL = 15  # minutes
+UPDATE_JITTER = 0.1  # fraction of the interval added at random to each wait
+UPDATE_MAX_BACKOFF = 60  # minutes
 # Added API rate limit constants
 COINGECKO_RATE_LIMIT_WAIT = 6  # seconds between API calls
+# Vector index: "flat" (exact, FP32), "sq8" (exact, 8-bit codes), or one of the
+# approximate indexes "ivf_pq", "ivf_sq", "hnsw_sq" once the corpus has
+# ANN_MIN_VECTORS chunks
+VECTOR_INDEX_TYPE = "sq8"
+ANN_MIN_VECTORS = 10000  # below this, exact flat search is already sub-ms
+IVF_NLIST = 256
+IVF_NPROBE = 16
+PQ_M = 16  # PQ sub-quantizers, must divide the embedding dimension
+HNSW_M = 32
+HNSW_EF_SEARCH = 64
+RETRIEVAL_K = 5  # documents retrieved per question
+
+QA_PROMPT_TEMPLATE = """
+        You are a helpful cryptocurrency assistant with access to real-time and historical data.
+        Use the following retrieved context to answer the question.
+        If you don't know the answer, don't make up an answer, just say you don't know.
+        Always mention when the data was last updated if relevant to the question.
+        If asked about historical trends or patterns, refer to the 365-day historical data.
+
+        Context: {context}
+
+        Chat History: {chat_history}
+
+        Question: {question}
+
+        Your answer:
+        """
+
+
+@contextlib.contextmanager
+def _index_lock(path: str, mode: int):
+    """Hold an advisory lock on the vector store at `path` (shared or exclusive)."""
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _build_ann_index(flat_index):
+    """Rebuild a flat FAISS index as the index selected by VECTOR_INDEX_TYPE."""
+    if VECTOR_INDEX_TYPE == "flat":
+        return flat_index
+    if VECTOR_INDEX_TYPE != "sq8" and flat_index.ntotal < ANN_MIN_VECTORS:
+        return flat_index
+    d = flat_index.d
+    metric = flat_index.metric_type
+    vectors = flat_index.reconstruct_n(0, flat_index.ntotal)
+    if VECTOR_INDEX_TYPE == "sq8":
+        # The stored vectors are unit-normalized, so 8-bit codes over [-1, 1]
+        # lose little precision while cutting scan bandwidth 4x.
+        index = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_8bit, metric)
+    elif VECTOR_INDEX_TYPE == "ivf_pq":
+        quantizer = faiss.IndexFlat(d, metric)
+        index = faiss.IndexIVFPQ(quantizer, d, IVF_NLIST, PQ_M, 8, metric)
+    elif VECTOR_INDEX_TYPE == "ivf_sq":
+        quantizer = faiss.IndexFlat(d, metric)
+        index = faiss.IndexIVFScalarQuantizer(
+            quantizer, d, IVF_NLIST, faiss.ScalarQuantizer.QT_8bit, metric
+        )
+    elif VECTOR_INDEX_TYPE == "hnsw_sq":
+        index = faiss.IndexHNSWSQ(d, faiss.ScalarQuantizer.QT_8bit, HNSW_M, metric)
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    else:
+        raise ValueError(f"Unknown VECTOR_INDEX_TYPE: {VECTOR_INDEX_TYPE}")
+    index.train(vectors)
+    index.add(vectors)
+    if VECTOR_INDEX_TYPE.startswith("ivf"):
+        index.nprobe = IVF_NPROBE
+    logger.info("Built %s index over %d vectors", VECTOR_INDEX_TYPE, index.ntotal)
+    return index
+
+
+def _upgrade_legacy_index(index):
+    """
+    Normalize a flat index saved before embeddings were normalized at insert
+    time, and rebuild it as the index selected by VECTOR_INDEX_TYPE.
+    """
+    if not isinstance(index, faiss.IndexFlat) or index.ntotal == 0:
+        return index
+    vectors = index.reconstruct_n(0, index.ntotal)
+    if np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-3):
+        return index
+    logger.info("Normalizing %d vectors of a legacy index", index.ntotal)
+    faiss.normalize_L2(vectors)
+    flat_index = faiss.IndexFlat(index.d, index.metric_type)
+    flat_index.add(vectors)
+    return _build_ann_index(flat_index)
+
 
 class CryptoData:
     def __init__(self):
@@ -61,10 +159,10 @@ class CryptoData:
             response = requests.get(f"{COINGECKO_API_URL}/simple/price", params=params)
             response.raise_for_status()
             self.price_data = response.json()
-            logger.info(f"Successfully fetched price data for {len(coins)} coins")
+            logger.info("Successfully fetched price data for %d coins", len(coins))
             return self.price_data
         except requests.RequestException as e:
-            logger.error(f"Error fetching crypto prices: {e}")
+            logger.error("Error fetching crypto prices: %s", e)
             return {}
     
     def fetch_historical_data(self, coins=["bitcoin"], days=365):
@@ -73,7 +171,7 @@ class CryptoData:
         try:
             for coin in coins:
                 try:
-                    logger.info(f"Fetching {days} days of historical data for {coin}")
+                    logger.info("Fetching %s days of historical data for %s", days, coin)
                     # Use the CoinGecko market chart endpoint which has historical data
                     response = requests.get(
                         f"{COINGECKO_API_URL}/coins/{coin}/market_chart",
@@ -108,25 +206,25 @@ class CryptoData:
                         df = df.set_index('date')
                         
                         self.historical_data[coin] = df
-                        logger.info(f"Successfully processed {len(df)} days of data for {coin}")
+                        logger.info("Successfully processed %d days of data for %s", len(df), coin)
                     else:
-                        logger.warning(f"No price data found for {coin}")
+                        logger.warning("No price data found for %s", coin)
                         self.historical_data[coin] = None
                     
                     # Respect API rate limits
                     time.sleep(COINGECKO_RATE_LIMIT_WAIT)
                     
                 except requests.RequestException as e:
-                    logger.error(f"Error fetching historical data for {coin}: {e}")
+                    logger.error("Error fetching historical data for %s: %s", coin, e)
                     self.historical_data[coin] = None
                     # Continue with other coins even if one fails
                     time.sleep(COINGECKO_RATE_LIMIT_WAIT)
                     continue
                     
-            logger.info(f"Successfully fetched historical data for {len([c for c, d in self.historical_data.items() if d is not None])} coins")
+            logger.info("Successfully fetched historical data for %d coins", len([c for c, d in self.historical_data.items() if d is not None]))
             return self.historical_data
         except Exception as e:
-            logger.error(f"Error in historical data fetch process: {e}")
+            logger.error("Error in historical data fetch process: %s", e)
             return {}
      
     def fetch_market_data(self, coins=["bitcoin"]):
@@ -141,14 +239,14 @@ class CryptoData:
                     # Increased delay to respect API rate limits
                     time.sleep(COINGECKO_RATE_LIMIT_WAIT)
                 except requests.RequestException as e:
-                    logger.error(f"Error fetching market data for {coin}: {e}")
+                    logger.error("Error fetching market data for %s: %s", coin, e)
                     # Continue with other coins even if one fails
                     continue
                     
-            logger.info(f"Successfully fetched market data for {len(self.market_data)} coins")
+            logger.info("Successfully fetched market data for %d coins", len(self.market_data))
             return self.market_data
         except Exception as e:
-            logger.error(f"Error fetching market data: {e}")
+            logger.error("Error fetching market data: %s", e)
             return {}
     
     def fetch_crypto_news(self, query="cryptocurrency", days=3):
@@ -170,15 +268,15 @@ class CryptoData:
             
             data = response.json()
             self.news_data = data.get('articles', [])
-            logger.info(f"Successfully fetched {len(self.news_data)} news articles")
+            logger.info("Successfully fetched %d news articles", len(self.news_data))
             return self.news_data
         except requests.RequestException as e:
-            logger.error(f"Error fetching crypto news: {e}")
+            logger.error("Error fetching crypto news: %s", e)
             return []
     
     def update_all_data(self, coins=["bitcoin"]):
         """Update all cryptocurrency and news data."""
-        logger.info(f"Starting data update for coins: {', '.join(coins)}")
+        logger.info("Starting data update for coins: %s", ', '.join(coins))
         
         self.fetch_crypto_prices(coins)
         # Added historical data fetch with the default 365 days
@@ -187,7 +285,7 @@ class CryptoData:
         self.fetch_crypto_news()
         
         self.last_update = datetime.datetime.now()
-        logger.info(f"All data updated at {self.last_update}")
+        logger.info("All data updated at %s", self.last_update)
     
     def get_formatted_data(self) -> List[Document]:
         """Format all data into documents for the vector store."""
@@ -460,10 +558,15 @@ class RAGSystem:
             
         # Split documents into chunks
         all_splits = self.text_splitter.split_documents(documents)
-        logger.info(f"Split {len(documents)} documents into {len(all_splits)} chunks")
+        logger.info("Split %d documents into %d chunks", len(documents), len(all_splits))
         
         # Create vector store
-        self.vectorstore = FAISS.from_documents(all_splits, self.embeddings)
+        # Normalize embeddings once at insert time (queries are normalized by the
+        # store too): L2 ranking on unit vectors is cosine / inner-product ranking.
+        self.vectorstore = FAISS.from_documents(
+            all_splits, self.embeddings, normalize_L2=True
+        )
+        self.vectorstore.index = _build_ann_index(self.vectorstore.index)
         logger.info("Vector store initialized successfully")
         
         # Initialize the QA chain
@@ -480,7 +583,7 @@ class RAGSystem:
         
         # Add to existing vectorstore
         self.vectorstore.add_documents(splits)
-        logger.info(f"Added {len(splits)} new chunks to the vector store")
+        logger.info("Added %d new chunks to the vector store", len(splits))
     
     def initialize_qa_chain(self):
         """Initialize the QA chain for answering questions."""
@@ -489,32 +592,16 @@ class RAGSystem:
             return
             
         # Define custom prompt
-        template = """
-        You are a helpful cryptocurrency assistant with access to real-time and historical data.
-        Use the following retrieved context to answer the question.
-        If you don't know the answer, don't make up an answer, just say you don't know.
-        Always mention when the data was last updated if relevant to the question.
-        If asked about historical trends or patterns, refer to the 365-day historical data.
-
-        Context: {context}
-
-        Chat History: {chat_history}
-
-        Question: {question}
-
-        Your answer:
-        """
-        
         prompt = PromptTemplate(
             input_variables=["context", "chat_history", "question"],
-            template=template
+            template=QA_PROMPT_TEMPLATE
         )
         
         # Initialize the chain
         llm = Ollama(model=self.model_name)
         self.qa_chain = ConversationalRetrievalChain.from_llm(
             llm=llm,
-            retriever=self.vectorstore.as_retriever(search_kwargs={"k": 5}),
+            retriever=self.vectorstore.as_retriever(search_kwargs={"k": RETRIEVAL_K}),
             combine_docs_chain_kwargs={"prompt": prompt},
             return_source_documents=True
         )
@@ -541,53 +628,131 @@ class RAGSystem:
             if len(self.chat_history) > 10:  # Keep history manageable
                 self.chat_history.pop(0)
                 
-            logger.info(f"Successfully answered question: {question[:50]}...")
+            logger.info("Successfully answered question: %s...", question[:50])
             return result
         except Exception as e:
-            logger.error(f"Error answering question: {e}")
+            logger.error("Error answering question: %s", e)
             return {"answer": f"An error occurred while processing your question: {str(e)}"}
     
+    def stream_answer(self, question: str) -> Iterator[str]:
+        """Answer a question, yielding the answer in chunks as Ollama generates it."""
+        if not self.vectorstore:
+            logger.error("Cannot answer question: Vector store not initialized")
+            yield "System not initialized. Please try again later."
+            return
+        
+        docs = self.vectorstore.similarity_search(question, k=RETRIEVAL_K)
+        chat_history = "\n".join(
+            f"Human: {q}\nAssistant: {a}" for q, a in self.chat_history
+        )
+        prompt = QA_PROMPT_TEMPLATE.format(
+            context="\n\n".join(doc.page_content for doc in docs),
+            chat_history=chat_history,
+            question=question,
+        )
+        
+        chunks = []
+        for part in ollama.generate(model=self.model_name, prompt=prompt, stream=True):
+            chunks.append(part["response"])
+            yield part["response"]
+        
+        # Update chat history
+        self.chat_history.append((question, "".join(chunks)))
+        if len(self.chat_history) > 10:  # Keep history manageable
+            self.chat_history.pop(0)
+    
     def save_vectorstore(self, path: str = VECTOR_DB_PATH):
-        """Save the vector store to disk."""
+        """Save the vector store to disk.
+
+        The index is written to a staging directory and atomically renamed into
+        place under an exclusive lock, so readers never observe a partially
+        written file. The latest prices are saved next to it, so read-only
+        workers can report them without calling CoinGecko themselves.
+        """
         if not self.vectorstore:
             logger.error("Cannot save vector store: Not initialized")
             return False
             
         try:
-            self.vectorstore.save_local(path)
-            logger.info(f"Vector store saved to {path}")
+            tmp_path = f"{path}.tmp"
+            with _index_lock(path, fcntl.LOCK_EX):
+                self.vectorstore.save_local(tmp_path)
+                last_update = self.crypto_data.last_update
+                with open(os.path.join(tmp_path, "prices.json"), "w") as f:
+                    json.dump({
+                        "price_data": self.crypto_data.price_data,
+                        "last_update": last_update.isoformat() if last_update else None,
+                    }, f)
+                os.makedirs(path, exist_ok=True)
+                for name in os.listdir(tmp_path):
+                    os.replace(os.path.join(tmp_path, name), os.path.join(path, name))
+                os.rmdir(tmp_path)
+            logger.info("Vector store saved to %s", path)
             return True
         except Exception as e:
-            logger.error(f"Error saving vector store: {e}")
+            logger.error("Error saving vector store: %s", e)
             return False
     
     def load_vectorstore(self, path: str = VECTOR_DB_PATH):
-        """Load the vector store from disk."""
+        """Load the vector store, and the prices saved with it, from disk."""
         try:
             if os.path.exists(path):
-                self.vectorstore = FAISS.load_local(path, self.embeddings)
-                logger.info(f"Vector store loaded from {path}")
+                prices_path = os.path.join(path, "prices.json")
+                prices = None
+                with _index_lock(path, fcntl.LOCK_SH):
+                    # Same on-disk layout as `FAISS.save_local()`.
+                    index = faiss.read_index(os.path.join(path, "index.faiss"))
+                    with open(os.path.join(path, "index.pkl"), "rb") as f:
+                        docstore, index_to_docstore_id = pickle.load(f)
+                    if os.path.exists(prices_path):
+                        with open(prices_path) as f:
+                            prices = json.load(f)
+                if prices:
+                    self.crypto_data.price_data = prices["price_data"]
+                    if prices["last_update"]:
+                        self.crypto_data.last_update = datetime.datetime.fromisoformat(prices["last_update"])
+                self.vectorstore = FAISS(
+                    self.embeddings.embed_query,
+                    _upgrade_legacy_index(index),
+                    docstore,
+                    index_to_docstore_id,
+                    normalize_L2=True,
+                )
+                logger.info("Vector store loaded from %s", path)
                 self.initialize_qa_chain()
                 return True
             else:
-                logger.warning(f"Vector store path {path} does not exist")
+                logger.warning("Vector store path %s does not exist", path)
                 return False
         except Exception as e:
-            logger.error(f"Error loading vector store: {e}")
+            logger.error("Error loading vector store: %s", e)
             return False
 
 
 class CryptoAssistant:
-    def __init__(self, model_name: str = OLLAMA_MODEL):
+    def __init__(self, model_name: str = OLLAMA_MODEL, read_only: bool = False):
         self.crypto_data = CryptoData()
         self.rag_system = RAGSystem(self.crypto_data, model_name)
+        # A read-only assistant never rebuilds the index or fetches data: it
+        # loads the index and prices published by the single writer process and
+        # reloads them on update.
+        self.read_only = read_only
         self.update_thread = None
-        self.running = False
+        self.stop_event = threading.Event()
+        # Serializes scheduled and on-demand updates so they never overlap.
+        self.update_lock = threading.Lock()
+        # (last_update, rendered summary) of the most recent summary built.
+        self.summary_cache = None
         
     def initialize(self):
         """Initialize the assistant."""
         logger.info("Initializing Crypto Assistant...")
         
+        if self.read_only:
+            if not self.rag_system.load_vectorstore():
+                logger.error("No vector store to share: start a writer process first")
+            return
+        
         # Try to load existing vector store, or create new one
         if not self.rag_system.load_vectorstore():
             # Update data and initialize from scratch
@@ -600,21 +765,27 @@ class CryptoAssistant:
     
     def update_data(self, coins=["bitcoin"]):
         """Update all data and refresh the vector store."""
-        logger.info(f"Updating cryptocurrency data for: {', '.join(coins)}")
-        
-        # Update all data
-        self.crypto_data.update_all_data(coins)
-        
-        # Get formatted documents
-        documents = self.crypto_data.get_formatted_data()
-        
-        # Update vector store
-        self.rag_system.update_vectorstore(documents)
-        
-        # Save updated vector store
-        self.rag_system.save_vectorstore()
-        
-        logger.info("Data update complete")
+        with self.update_lock:
+            if self.read_only:
+                # Pick up the index most recently published by the writer.
+                self.rag_system.load_vectorstore()
+                return
+            
+            logger.info("Updating cryptocurrency data for: %s", ', '.join(coins))
+            
+            # Update all data
+            self.crypto_data.update_all_data(coins)
+            
+            # Get formatted documents
+            documents = self.crypto_data.get_formatted_data()
+            
+            # Update vector store
+            self.rag_system.update_vectorstore(documents)
+            
+            # Save updated vector store
+            self.rag_system.save_vectorstore()
+            
+            logger.info("Data update complete")
     
     def scheduled_update(self):
         """Run scheduled updates."""
@@ -623,33 +794,70 @@ class CryptoAssistant:
     def start_update_thread(self):
         """Start background thread for scheduled updates."""
         def run_scheduler():
-            schedule.every(UPDATE_INTERVAL).minutes.do(self.scheduled_update)
-            
-            self.running = True
-            while self.running:
-                schedule.run_pending()
-                time.sleep(1)
+            interval = UPDATE_INTERVAL * 60
+            # Jitter the waits so that workers started together do not all hit
+            # CoinGecko at the same moment; back off exponentially on failure.
+            delay = interval
+            while not self.stop_event.wait(delay + random.uniform(0, delay * UPDATE_JITTER)):
+                try:
+                    self.scheduled_update()
+                    delay = interval
+                except Exception as e:
+                    delay = min(delay * 2, UPDATE_MAX_BACKOFF * 60)
+                    logger.error("Scheduled update failed, retrying in %.0fs: %s", delay, e)
         
         if self.update_thread is None or not self.update_thread.is_alive():
+            self.stop_event.clear()
             self.update_thread = threading.Thread(target=run_scheduler)
             self.update_thread.daemon = True
             self.update_thread.start()
-            logger.info(f"Started scheduled updates every {UPDATE_INTERVAL} minutes")
+            logger.info("Started scheduled updates every %s minutes", UPDATE_INTERVAL)
     
     def stop_update_thread(self):
         """Stop the background update thread."""
-        self.running = False
+        self.stop_event.set()
         if self.update_thread and self.update_thread.is_alive():
             self.update_thread.join(timeout=5)
             logger.info("Stopped scheduled updates")
     
+    def get_coins_summary(self) -> str:
+        """Return a short price summary, rebuilt only when the data changes."""
+        last_update = self.crypto_data.last_update
+        if self.summary_cache is not None and self.summary_cache[0] == last_update:
+            return self.summary_cache[1]
+        
+        lines = []
+        if last_update:
+            lines.append(f"Crypto summary (updated {last_update:%Y-%m-%d %H:%M:%S}):")
+        for coin, data in self.crypto_data.price_data.items():
+            price = data.get('usd')
+            line = f"{coin.capitalize()}: " + (f"${price:,.2f}" if price is not None else "N/A")
+            change = data.get('usd_24h_change')
+            if change is not None:
+                line += f" ({change:+.2f}% 24h)"
+            lines.append(line)
+        if not self.crypto_data.price_data:
+            lines.append("No price data available yet.")
+        
+        summary = "\n".join(lines)
+        self.summary_cache = (last_update, summary)
+        return summary
+    
+    def ask_stream(self, question: str) -> Iterator[str]:
+        """Process a user question, yielding the answer as it is generated."""
+        try:
+            yield from self.rag_system.stream_answer(question)
+        except Exception as e:
+            logger.error("Error processing question: %s", e)
+            yield f"Sorry, I encountered an error: {str(e)}"
+    
     def ask(self, question: str) -> str:
         """Process a user question and return the answer."""
         try:
             result = self.rag_system.answer_question(question)
             return result["answer"]
         except Exception as e:
-            logger.error(f"Error processing question: {e}")
+            logger.error("Error processing question: %s", e)
             return f"Sorry, I encountered an error: {str(e)}"
 
 # Chat interface for the console
@@ -694,13 +902,23 @@ def console_chat():
 
 
 # Web interface using Flask
-def create_web_app():
-    from flask import Flask, request, jsonify, render_template
+def create_web_app(read_only: bool = False):
+    """Create the Flask app.
+
+    To serve from several gunicorn workers, run one writer (e.g.
+    `python bitcoinassistant.py --web`) and start the workers with
+    `gunicorn "bitcoinassistant:create_web_app(read_only=True)"` so they all
+    load the index the writer publishes instead of each rebuilding it. Do not
+    use `--preload`: the update thread would start in the gunicorn master and
+    would not survive the fork into the workers.
+    """
+    from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 
     app = Flask(__name__)
-    assistant = CryptoAssistant()
+    assistant = CryptoAssistant(read_only=read_only)
     assistant.initialize()
     assistant.start_update_thread()
+    app.assistant = assistant
 
     @app.route("/")
     def home():
@@ -716,6 +934,20 @@ def create_web_app():
         answer = assistant.ask(question)
         return jsonify({"answer": answer})
 
+    @app.route("/api/ask_stream")
+    def ask_stream():
+        question = request.args.get("question", "")
+        if not question:
+            return jsonify({"error": "No question provided"}), 400
+        
+        def events():
+            # Server-sent events: one `data:` line per generated chunk
+            for chunk in assistant.ask_stream(question):
+                yield f"data: {json.dumps({'chunk': chunk})}\n\n"
+            yield f"data: {json.dumps({'done': True})}\n\n"
+        
+        return Response(stream_with_context(events()), mimetype="text/event-stream")
+
     @app.route("/api/summary")
     def summary():
         return jsonify({"summary": assistant.get_coins_summary()})
@@ -837,33 +1069,39 @@ def create_templates_folder():
                 appendMessage('user', message);
                 userInput.value = '';
                 
-                // Display loading indicator
-                const loadingId = appendMessage('assistant', 'Thinking...');
+                // Display loading indicator, then stream the answer into it
+                const messageId = appendMessage('assistant', 'Thinking...');
+                const messageText = document.getElementById(messageId).querySelector('p');
+                const chatContainer = document.getElementById('chatContainer');
+                const source = new EventSource('/api/ask_stream?question=' + encodeURIComponent(message));
+                let answer = '';
                 
-                fetch('/api/ask', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({ question: message })
-                })
-                .then(response => response.json())
-                .then(data => {
-                    // Remove loading message and add actual response
-                    removeMessage(loadingId);
-                    appendMessage('assistant', data.answer);
-                })
-                .catch(error => {
-                    removeMessage(loadingId);
-                    appendMessage('assistant', 'Sorry, an error occurred while processing your request.');
+                source.onmessage = function(event) {
+                    const data = JSON.parse(event.data);
+                    if (data.done) {
+                        source.close();
+                        return;
+                    }
+                    answer += data.chunk;
+                    messageText.textContent = answer;
+                    chatContainer.scrollTop = chatContainer.scrollHeight;
+                };
+                source.onerror = function(error) {
+                    // Close instead of letting EventSource reconnect and re-ask
+                    source.close();
+                    if (answer === '') {
+                        messageText.textContent = 'Sorry, an error occurred while processing your request.';
+                    }
                     console.error('Error:', error);
-                });
+                };
             }
             
+            let messageCount = 0;
+            
             function appendMessage(sender, text) {
                 const chatContainer = document.getElementById('chatContainer');
                 const messageDiv = document.createElement('div');
-                const messageId = Date.now().toString();
+                const messageId = 'message-' + (messageCount++);
                 
                 messageDiv.id = messageId;
                 messageDiv.className = `message ${sender}-message`;
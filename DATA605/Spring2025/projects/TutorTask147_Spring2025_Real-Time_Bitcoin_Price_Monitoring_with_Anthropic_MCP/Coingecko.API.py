@@ -13,12 +13,48 @@ Script naming convention: <project>.API.py (here: coingecko.API.py).
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
+from urllib.parse import urlencode
 import requests
 
 _LOG = logging.getLogger(__name__)
 
+# Keep-alive session shared by all requests.
+_SESSION = requests.Session()
+# Validators and parsed body of the last 200 response, keyed by request URL.
+_ETAG_STORE: Dict[str, Tuple[Dict[str, str], Any]] = {}
+
+
+def _get_json(url: str, params: Dict[str, Any]) -> Any:
+    """
+    Send a conditional GET request and return the decoded JSON body.
+
+    If a previous response carried an `ETag` or `Last-Modified` header, it is
+    sent back as `If-None-Match` / `If-Modified-Since` and a `304 Not
+    Modified` answer is served from the cached body without re-parsing.
+
+    :param url: The endpoint URL.
+    :param params: The query parameters.
+    :return: The JSON-decoded response body.
+    """
+    key = f"{url}?{urlencode(sorted(params.items()))}"
+    validators, cached = _ETAG_STORE.get(key, ({}, None))
+    resp = _SESSION.get(url, params=params, headers=validators)
+    if resp.status_code == 304:
+        _LOG.debug("Not modified: %s", key)
+        return cached
+    resp.raise_for_status()
+    data = resp.json()
+    validators = {}
+    if "ETag" in resp.headers:
+        validators["If-None-Match"] = resp.headers["ETag"]
+    if "Last-Modified" in resp.headers:
+        validators["If-Modified-Since"] = resp.headers["Last-Modified"]
+    if validators:
+        _ETAG_STORE[key] = (validators, data)
+    return data
+
 
 def get_bitcoin_price(vs_currency: str = "usd") -> float:
     """
@@ -31,9 +67,7 @@ def get_bitcoin_price(vs_currency: str = "usd") -> float:
     url = "https://api.coingecko.com/api/v3/simple/price"
     params = {"ids": "bitcoin", "vs_currencies": vs_currency}
     # Send HTTP GET request.
-    resp = requests.get(url, params=params)
-    resp.raise_for_status()
-    data = resp.json()
+    data = _get_json(url, params)
     # Extract and return price.
     price = data["bitcoin"][vs_currency]
     _LOG.debug("Fetched BTC price: %s %s", price, vs_currency)
@@ -57,9 +91,7 @@ def get_coin_ohlc(
     url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/ohlc"
     params = {"vs_currency": vs_currency, "days": days}
     # Send HTTP GET request.
-    resp = requests.get(url, params=params)
-    resp.raise_for_status()
-    data = resp.json()
+    data = _get_json(url, params)
     _LOG.debug("Fetched %d OHLC points for %s", len(data), coin_id)
     return data
 
@@ -82,9 +114,7 @@ def get_historical_data(
     url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/history"
     params = {"date": date_str}
     # Send HTTP GET request.
-    resp = requests.get(url, params=params)
-    resp.raise_for_status()
-    data = resp.json()
+    data = _get_json(url, params)
     _LOG.debug("Fetched historical data for %s on %s", coin_id, date_str)
     return data
 
@@ -106,9 +136,7 @@ def get_market_chart(
     url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
     params = {"vs_currency": vs_currency, "days": days}
     # Send HTTP GET request.
-    resp = requests.get(url, params=params)
-    resp.raise_for_status()
-    data = resp.json()
+    data = _get_json(url, params)
     _LOG.debug("Fetched market chart data for %s: %d price points", coin_id, len(data["prices"]))
     return data
 
@@ -117,8 +145,9 @@ def main() -> None:
     """
     Demonstrate usage of CoinGecko API functions.
     """
-    # Configure logging format.
-    logging.basicConfig(level=logging.INFO)
+    # Configure logging format, unless the caller already did.
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO)
     _LOG.info("Starting CoinGecko API client demonstration.")
     price = get_bitcoin_price()
     _LOG.info("Current BTC price: $%0.2f USD", price)
@@ -17,6 +17,10 @@ naming should be as follows:
 """
 
 # Same as tutorial_template/template.API.py
+import asyncio
+import time
+from collections import deque
+from functools import lru_cache
 from typing import Any
 from datetime import datetime
 import requests
@@ -28,35 +32,66 @@ from mcp.server.fastmcp import FastMCP
 # Initialize MCP server
 mcp = FastMCP("bitcoin_monitor")
 BASE_URL = "https://api.coingecko.com/api/v3"
+_PRICE_URL = f"{BASE_URL}/simple/price"
+_PRICE_PARAMS = (("ids", "bitcoin"), ("vs_currencies", "usd"))
+_OHLC_URL = f"{BASE_URL}/coins/bitcoin/ohlc"
+_HISTORY_URL = f"{BASE_URL}/coins/bitcoin/history"
+_MARKET_CHART_URL = f"{BASE_URL}/coins/bitcoin/market_chart"
 THRESHOLD = 500.0  # USD price-change threshold
+PRICE_TTL = 5.0  # seconds a fetched price is served from memory
+RATE_LIMIT_CALLS = 50  # CoinGecko free tier allows 50 calls per minute
+RATE_LIMIT_PERIOD = 60.0  # seconds
 _last_price: float | None = None
+_price_cache: tuple[float, float] | None = None  # (fetched_at, price)
+_call_times: deque[float] = deque(maxlen=RATE_LIMIT_CALLS)
+_rate_lock = asyncio.Lock()
+
+async def _throttle() -> None:
+   """
+   Wait until one more CoinGecko call fits in the rate-limit window.
+   """
+   async with _rate_lock:
+      if len(_call_times) == RATE_LIMIT_CALLS:
+         wait = RATE_LIMIT_PERIOD - (time.monotonic() - _call_times[0])
+         if wait > 0:
+            await asyncio.sleep(wait)
+      _call_times.append(time.monotonic())
+
+@lru_cache(maxsize=16)
+def _days_params(days: int) -> tuple[tuple[str, Any], ...]:
+   """
+   Return the immutable query parameters for a USD request over `days` days.
+   """
+   return (("vs_currency", "usd"), ("days", days))
 
 @mcp.resource("crypto://price")
 async def get_price() -> float:
-   """Return the latest BTC price in USD."""
-   url = f"{BASE_URL}/simple/price"
-   params = {"ids": "bitcoin", "vs_currencies": "usd"}
-   resp = requests.get(url, params=params)
+   """Return the latest BTC price in USD (cached for `PRICE_TTL` seconds)."""
+   global _price_cache
+   if _price_cache is not None and time.monotonic() - _price_cache[0] < PRICE_TTL:
+      return _price_cache[1]
+   await _throttle()
+   resp = requests.get(_PRICE_URL, params=_PRICE_PARAMS)
    resp.raise_for_status()
-   return resp.json()["bitcoin"]["usd"]
+   price = resp.json()["bitcoin"]["usd"]
+   _price_cache = (time.monotonic(), price)
+   return price
 
 @mcp.tool()
 async def get_ohlc(days: int = 7) -> list[Any]:
    """
    Return a list of [timestamp, open, high, low, close] for the past `days` days.
    """
-   url = f"{BASE_URL}/coins/bitcoin/ohlc"
-   params = {"vs_currency": "usd", "days": days}
-   resp = requests.get(url, params=params)
+   await _throttle()
+   resp = requests.get(_OHLC_URL, params=_days_params(days))
    resp.raise_for_status()
    return resp.json()
 
 @mcp.tool()
 async def get_history(date: str) -> dict[str, Any]:
    """Return the BTC market snapshot on the given date."""
-   url = f"{BASE_URL}/coins/bitcoin/history"
-   params = {"date": date}
-   resp = requests.get(url, params=params)
+   await _throttle()
+   resp = requests.get(_HISTORY_URL, params={"date": date})
    resp.raise_for_status()
    return resp.json()
 
@@ -66,7 +101,7 @@ async def check_price_change(threshold: float = THRESHOLD) -> str:
    Compare current price to last fetched price. If change > threshold, return an alert.
    """
    global _last_price
-   price = get_price()
+   price = await get_price()
    if _last_price is None:
       _last_price = price
       return "Initialized last_price"
@@ -84,10 +119,9 @@ async def detect_trend(days: int = 30) -> str:
    Fit an ARIMA model to daily-averaged price data over the past `days` days
    and return the latest predicted value.
    """
+   await _throttle()
    # Get market-chart data
-   url = f"{BASE_URL}/coins/bitcoin/market_chart"
-   params = {"vs_currency": "usd", "days": days}
-   data = requests.get(url, params=params).json()["prices"]
+   data = requests.get(_MARKET_CHART_URL, params=_days_params(days)).json()["prices"]
    # Build DataFrame
    df = pd.DataFrame(data, columns=["timestamp", "price"])
    df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
@@ -104,10 +138,9 @@ async def plot_price(days: int = 7) -> str:
    Create a Plotly line chart of BTC prices over the last `days` days.
    Returns the path to an HTML file with the chart.
    """
+   await _throttle()
    # Fetch data
-   url = f"{BASE_URL}/coins/bitcoin/market_chart"
-   params = {"vs_currency": "usd", "days": days}
-   data = requests.get(url, params=params).json()["prices"]
+   data = requests.get(_MARKET_CHART_URL, params=_days_params(days)).json()["prices"]
    df = pd.DataFrame(data, columns=["timestamp", "price"])
    df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
    # Plot
@@ -9,13 +9,20 @@ with Amazon RDS.
 - Functions here handle database connections, data fetching, and time series analysis.
 """
 
+import atexit
+import io
+import threading
+import weakref
+from contextlib import contextmanager
 import pandas as pd
 import logging
 import psycopg2
+import psycopg2.pool
+from psycopg2.extras import execute_values
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from sklearn.model_selection import train_test_split
 # from pycaret.classification import compare_models
 
 
@@ -36,31 +43,87 @@ RDS_PORT = 5432
 RDS_DATABASE = "bitcoin_db"
 RDS_USERNAME = "bitcoin" 
 RDS_PASSWORD = ""  
+# connection pool size
+RDS_POOL_MIN_CONN = 1
+RDS_POOL_MAX_CONN = 10
+
+# Created on first use so that importing the module does not connect.
+_POOL = None
+_POOL_LOCK = threading.Lock()
+# Pooled connections on which the raw price INSERT has been prepared; a
+# prepared statement lives as long as the server session.
+_PREPARED_INSERT_CONNS = weakref.WeakSet()
 
 # -----------------------------------------------------------------------------
 # Database Connection Functions
 # -----------------------------------------------------------------------------
 
+def _get_pool():
+    """
+    Return the module-level connection pool, creating it on first use.
+    
+    :return: Thread-safe psycopg2 connection pool
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            logger.info("Connecting to RDS database")
+            _POOL = psycopg2.pool.ThreadedConnectionPool(
+                minconn=RDS_POOL_MIN_CONN,
+                maxconn=RDS_POOL_MAX_CONN,
+                host=RDS_HOST,
+                port=RDS_PORT,
+                database=RDS_DATABASE,
+                user=RDS_USERNAME,
+                password=RDS_PASSWORD
+            )
+            atexit.register(_POOL.closeall)
+    return _POOL
+
 def get_db_connection():
     """
-    Create a connection to the Amazon RDS PostgreSQL database.
+    Get a connection to the Amazon RDS PostgreSQL database from the pool.
+    
+    The connection must be handed back with `release_db_connection()` rather
+    than closed.
     
     :return: Database connection object
     """
-    logger.info("Connecting to RDS database")
     try:
-        conn = psycopg2.connect(
-            host=RDS_HOST,
-            port=RDS_PORT,
-            database=RDS_DATABASE,
-            user=RDS_USERNAME,
-            password=RDS_PASSWORD
-        )
-        return conn
+        return _get_pool().getconn()
     except Exception as e:
         logger.error(f"Error connecting to database: {e}")
         raise
 
+def release_db_connection(conn):
+    """
+    Return a connection obtained with `get_db_connection()` to the pool.
+    
+    :param conn: Database connection object
+    """
+    _get_pool().putconn(conn)
+
+@contextmanager
+def db_cursor():
+    """
+    Yield a cursor on a pooled connection and commit when the block exits.
+    
+    The transaction is rolled back if the block raises, and the connection is
+    returned to the pool in both cases.
+    
+    :return: Database cursor object
+    """
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            yield cur
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release_db_connection(conn)
+
 def create_tables_if_not_exist():
     """
     Create the necessary tables for Bitcoin data if they don't exist.
@@ -95,31 +158,27 @@ def create_tables_if_not_exist():
     );
     """
     
-    conn = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
+        with db_cursor() as cur:
+            # Create tables
+            cur.execute(create_raw_table_sql)
+            cur.execute(create_hourly_table_sql)
         
-        # Create tables
-        cur.execute(create_raw_table_sql)
-        cur.execute(create_hourly_table_sql)
-        
-        conn.commit()
         logger.info("Tables created successfully")
     except Exception as e:
         logger.error(f"Error creating tables: {e}")
-        if conn:
-            conn.rollback()
         raise
-    finally:
-        if conn:
-            cur.close()
-            conn.close()
 
 # -----------------------------------------------------------------------------
 # Bitcoin Data Functions
 # -----------------------------------------------------------------------------
 
+# HTTP session reused for all CoinGecko calls, keeping connections alive
+# (requests already asks for gzip-encoded responses)
+COINGECKO_TIMEOUT = 10  # seconds
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 def fetch_bitcoin_data_from_coingecko():
     """
     Fetch current Bitcoin price data from CoinGecko API.
@@ -137,7 +196,7 @@ def fetch_bitcoin_data_from_coingecko():
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = _SESSION.get(url, params=params, timeout=COINGECKO_TIMEOUT)
         response.raise_for_status()  # Raise exception for HTTP errors
         data = response.json()
         
@@ -163,40 +222,38 @@ def insert_raw_bitcoin_data(data):
     """
     logger.info("Inserting raw Bitcoin data into database")
     
-    insert_sql = """
+    # Prepared once per connection so Postgres does not parse and plan the
+    # INSERT on every call
+    prepare_sql = """
+    PREPARE insert_raw_bitcoin_price AS
     INSERT INTO raw_bitcoin_prices (timestamp, price_usd, volume_usd, market_cap_usd)
-    VALUES (%s, %s, %s, %s)
+    VALUES ($1, $2, $3, $4)
     RETURNING id;
     """
+    insert_sql = "EXECUTE insert_raw_bitcoin_price (%s, %s, %s, %s);"
     
-    conn = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute(
-            insert_sql, 
-            (
-                data["timestamp"],
-                data["price_usd"],
-                data["volume_usd"],
-                data["market_cap_usd"]
+        with db_cursor() as cur:
+            if cur.connection not in _PREPARED_INSERT_CONNS:
+                cur.execute(prepare_sql)
+                _PREPARED_INSERT_CONNS.add(cur.connection)
+            cur.execute(
+                insert_sql, 
+                (
+                    data["timestamp"],
+                    data["price_usd"],
+                    data["volume_usd"],
+                    data["market_cap_usd"]
+                )
             )
-        )
+            
+            record_id = cur.fetchone()[0]
         
-        record_id = cur.fetchone()[0]
-        conn.commit()
         logger.info(f"Data inserted successfully with ID: {record_id}")
         return record_id
     except Exception as e:
         logger.error(f"Error inserting data: {e}")
-        if conn:
-            conn.rollback()
         raise
-    finally:
-        if conn:
-            cur.close()
-            conn.close()
 
 def fetch_and_store_bitcoin_data():
     """
@@ -215,84 +272,56 @@ def fetch_and_store_bitcoin_data():
 def aggregate_hourly_data():
     """
     Aggregate raw Bitcoin data into hourly data points.
+    
+    The OHLC values of every hour not yet in `hourly_bitcoin_prices` are
+    computed and inserted by Postgres in a single statement, so no rows are
+    fetched into Python. Already aggregated hours are skipped with an
+    anti-join that probes the primary key index instead of hashing every
+    stored hour.
     """
     logger.info("Aggregating hourly Bitcoin data")
     
-    # Step 1: Get all hours that need aggregation
-    hours_query = """
-    SELECT DISTINCT date_trunc('hour', timestamp) as hour
-    FROM raw_bitcoin_prices
-    WHERE date_trunc('hour', timestamp) NOT IN (SELECT timestamp FROM hourly_bitcoin_prices)
-    ORDER BY hour;
+    aggregate_query = """
+    INSERT INTO hourly_bitcoin_prices
+    (timestamp, open_price_usd, high_price_usd, low_price_usd, close_price_usd, volume_usd)
+    SELECT
+        date_trunc('hour', timestamp) AS hour,
+        (array_agg(price_usd ORDER BY timestamp))[1] AS open_price_usd,
+        max(price_usd) AS high_price_usd,
+        min(price_usd) AS low_price_usd,
+        (array_agg(price_usd ORDER BY timestamp DESC))[1] AS close_price_usd,
+        avg(volume_usd) AS volume_usd
+    FROM raw_bitcoin_prices AS r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM hourly_bitcoin_prices AS h
+        WHERE h.timestamp = date_trunc('hour', r.timestamp)
+    )
+    GROUP BY hour
+    ORDER BY hour
+    ON CONFLICT (timestamp) 
+    DO UPDATE SET
+        open_price_usd = EXCLUDED.open_price_usd,
+        high_price_usd = EXCLUDED.high_price_usd,
+        low_price_usd = EXCLUDED.low_price_usd,
+        close_price_usd = EXCLUDED.close_price_usd,
+        volume_usd = EXCLUDED.volume_usd,
+        created_at = CURRENT_TIMESTAMP;
     """
     
-    conn = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Get all hours that need aggregation
-        cur.execute(hours_query)
-        hours = [row[0] for row in cur.fetchall()]
+        with db_cursor() as cur:
+            cur.execute(aggregate_query)
+            hours_aggregated = cur.rowcount
         
-        if not hours:
+        if not hours_aggregated:
             logger.info("No new hours to aggregate")
             return
         
-        logger.info(f"Aggregating {len(hours)} hours of data")
-        
-        # For each hour, calculate OHLC values
-        for hour in hours:
-            # Query for data in this hour
-            hour_data_query = """
-            SELECT 
-                price_usd, volume_usd
-            FROM raw_bitcoin_prices
-            WHERE timestamp >= %s AND timestamp < %s + INTERVAL '1 hour'
-            ORDER BY timestamp;
-            """
-            
-            cur.execute(hour_data_query, (hour, hour))
-            rows = cur.fetchall()
-            
-            if not rows:
-                continue
-                
-            # Calculate OHLC values
-            open_price = rows[0][0]  # First price
-            close_price = rows[-1][0]  # Last price
-            high_price = max(row[0] for row in rows)
-            low_price = min(row[0] for row in rows)
-            avg_volume = sum(row[1] for row in rows) / len(rows)
-            
-            # Insert into hourly_bitcoin_prices
-            insert_query = """
-            INSERT INTO hourly_bitcoin_prices
-            (timestamp, open_price_usd, high_price_usd, low_price_usd, close_price_usd, volume_usd)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (timestamp) 
-            DO UPDATE SET
-                open_price_usd = EXCLUDED.open_price_usd,
-                high_price_usd = EXCLUDED.high_price_usd,
-                low_price_usd = EXCLUDED.low_price_usd,
-                close_price_usd = EXCLUDED.close_price_usd,
-                volume_usd = EXCLUDED.volume_usd,
-                created_at = CURRENT_TIMESTAMP;
-            """
-            
-            cur.execute(insert_query, (hour, open_price, high_price, low_price, close_price, avg_volume))
-        
-        conn.commit()
+        logger.info(f"Aggregated {hours_aggregated} hours of data")
         logger.info("Hourly data aggregated successfully")
     except Exception as e:
         logger.error(f"Error aggregating hourly data: {e}")
-        if conn:
-            conn.rollback()
         raise
-    finally:
-        if conn:
-            cur.close()
-            conn.close()
 
 def get_bitcoin_price_history(days=7):
     """
@@ -306,25 +335,29 @@ def get_bitcoin_price_history(days=7):
     query = """
     SELECT timestamp, price_usd, volume_usd, market_cap_usd
     FROM raw_bitcoin_prices
-    WHERE timestamp > NOW() - INTERVAL '%s DAY'
-    ORDER BY timestamp;
+    WHERE timestamp > NOW() - %s * INTERVAL '1 day'
+    ORDER BY timestamp
     """
     
-    conn = None
     try:
-        conn = get_db_connection()
+        buffer = io.StringIO()
+        with db_cursor() as cur:
+            # Stream the result as CSV with COPY instead of fetching Python row
+            # tuples; COPY takes no bind parameters, so interpolate them first
+            copy_sql = "COPY ({}) TO STDOUT WITH (FORMAT CSV, HEADER)".format(
+                cur.mogrify(query, (days,)).decode()
+            )
+            cur.copy_expert(copy_sql, buffer)
         
-        # Read data directly into pandas DataFrame
-        df = pd.read_sql_query(query, conn, params=(days,))
+        # Parse the CSV into a DataFrame with pandas' C parser
+        buffer.seek(0)
+        df = pd.read_csv(buffer, parse_dates=['timestamp'])
         
         logger.info(f"Retrieved {len(df)} records of Bitcoin price history")
         return df
     except Exception as e:
         logger.error(f"Error retrieving Bitcoin price history: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 def fetch_and_store_historical_bitcoin_data(days=30):
     """
@@ -344,11 +377,10 @@ def fetch_and_store_historical_bitcoin_data(days=30):
     }
     
     records_inserted = 0
-    conn = None
     
     try:
         # Fetch historical data
-        response = requests.get(url, params=params)
+        response = _SESSION.get(url, params=params, timeout=COINGECKO_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         
@@ -357,29 +389,20 @@ def fetch_and_store_historical_bitcoin_data(days=30):
         volumes = data["total_volumes"]  
         market_caps = data["market_caps"]  
         
-        # Prepare data for batch insert
-        historical_data = []
-        for i in range(len(prices)):
-            # Convert millisecond timestamp to datetime
-            timestamp = datetime.fromtimestamp(prices[i][0] / 1000)
-            
-            datapoint = {
-                "timestamp": timestamp,
-                "price_usd": prices[i][1],
-                "volume_usd": volumes[i][1],
-                "market_cap_usd": market_caps[i][1]
-            }
-            historical_data.append(datapoint)
+        # Build insert rows in one pass, converting millisecond timestamps
+        rows = [
+            (datetime.fromtimestamp(ts / 1000), price, volume, market_cap)
+            for (ts, price), (_, volume), (_, market_cap) in zip(prices, volumes, market_caps)
+        ]
         
-        # Insert data into database
-        for datapoint in historical_data:
-            try:
-                record_id = insert_raw_bitcoin_data(datapoint)
-                records_inserted += 1
-            except Exception as e:
-                logger.warning(f"Couldn't insert record for {datapoint['timestamp']}: {e}")
-                # Continue with other records
-                continue
+        # Insert all rows with a single multi-row INSERT over one connection
+        insert_sql = """
+        INSERT INTO raw_bitcoin_prices (timestamp, price_usd, volume_usd, market_cap_usd)
+        VALUES %s;
+        """
+        with db_cursor() as cur:
+            execute_values(cur, insert_sql, rows, page_size=1000)
+        records_inserted = len(rows)
         
         logger.info(f"Successfully inserted {records_inserted} historical records")
         return records_inserted
@@ -402,6 +425,9 @@ def split_data(df: pd.DataFrame, target_column: str, test_size: float = 0.2):
 
     :return: X_train, X_test, y_train, y_test
     """
+    # Imported here so that the database helpers do not pay for loading sklearn
+    from sklearn.model_selection import train_test_split
+    
     logger.info("Splitting data into train and test sets")
     X = df.drop(columns=[target_column])
     y = df[target_column]
@@ -7,13 +7,15 @@ It provides a layer of abstraction over the Redis API and CoinGecko API.
 
 import redis
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 import logging
+import weakref
 from datetime import datetime
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Union, Optional, Tuple, Any
+from typing import Dict, List, Union, Optional, Tuple, Any, Iterator
 
 # -----------------------------------------------------------------------------
 # Logging
@@ -23,6 +25,36 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Time series stored per currency when the RedisTimeSeries module is available,
+# as (history field, CoinGecko field template) pairs.
+TIMESERIES_FIELDS = [
+    ('price', '{currency}'),
+    ('market_cap', '{currency}_market_cap'),
+    ('volume_24h', '{currency}_24h_vol'),
+    ('change_24h', '{currency}_24h_change'),
+    ('last_updated_at', 'last_updated_at'),
+]
+
+# Fields of each sorted-set history member, stored as one comma-separated
+# string of numbers in this order (CoinGecko field templates).
+HISTORY_FIELDS = (
+    'timestamp',
+    '{currency}',
+    '{currency}_market_cap',
+    '{currency}_24h_vol',
+    '{currency}_24h_change',
+    'last_updated_at',
+)
+
+# Fields of the `bitcoin:data:{currency}` hash, all numeric.
+HASH_FIELDS = ('price', 'market_cap', 'volume_24h', 'change_24h', 'last_updated_at', 'timestamp')
+
+# Hash fields whose value moved by less than this are not rewritten.
+HASH_EPSILON = 1e-9
+
+# Whether each connection's server supports RedisTimeSeries, probed once.
+_TIMESERIES_SUPPORT = weakref.WeakKeyDictionary()
+
 # -----------------------------------------------------------------------------
 # Redis Connection
 # -----------------------------------------------------------------------------
@@ -54,10 +86,68 @@ def connect_to_redis(host: str, port: int, password: str) -> redis.Redis:
         logger.error(f"Failed to connect to Redis: {e}")
         raise
 
+def has_timeseries(redis_conn: redis.Redis) -> bool:
+    """
+    Check whether the Redis server has the RedisTimeSeries module loaded.
+    
+    The server is probed once per connection object and the answer cached.
+    
+    Args:
+        redis_conn (redis.Redis): Redis connection object
+        
+    Returns:
+        bool: True if TS.* commands are available
+    """
+    if redis_conn not in _TIMESERIES_SUPPORT:
+        try:
+            redis_conn.execute_command('TS.INFO', 'bitcoin:ts:probe')
+            supported = True
+        except redis.ResponseError as e:
+            # A missing key still proves the command exists
+            supported = 'unknown command' not in str(e).lower()
+        _TIMESERIES_SUPPORT[redis_conn] = supported
+        logger.info(f"RedisTimeSeries available: {supported}")
+    return _TIMESERIES_SUPPORT[redis_conn]
+
+def _timeseries_key(field: str, currency: str) -> str:
+    return f"bitcoin:ts:{field}:{currency}"
+
+def _encode_history_member(price_data: Dict[str, Any], currency: str) -> str:
+    values = (price_data.get(field.format(currency=currency)) for field in HISTORY_FIELDS)
+    return ','.join('nan' if value is None else repr(value) for value in values)
+
+def _decode_history_members(members: List[str], currency: str) -> List[Dict[str, Any]]:
+    """
+    Parse sorted-set history members back into price data records.
+    
+    All numeric members are parsed by NumPy in a single call; JSON members
+    written by earlier versions of this module are still understood.
+    """
+    names = [field.format(currency=currency) for field in HISTORY_FIELDS]
+    history = [json.loads(m) if m.startswith('{') else None for m in members]
+    numeric = [m for m in members if not m.startswith('{')]
+    if numeric:
+        rows = np.fromstring(','.join(numeric), sep=',').reshape(len(numeric), len(names))
+        records = iter([dict(zip(names, row)) for row in rows.tolist()])
+        history = [record if record is not None else next(records) for record in history]
+        for record in history:
+            # Integer fields come back as floats; restore them as written
+            record['timestamp'] = int(record['timestamp'])
+            last_updated_at = record.pop('last_updated_at', None)
+            if last_updated_at is not None and not np.isnan(last_updated_at):
+                record['last_updated_at'] = int(last_updated_at)
+    return history
+
 # -----------------------------------------------------------------------------
 # Bitcoin Data Fetching from CoinGecko API
 # -----------------------------------------------------------------------------
 
+# HTTP session reused for all CoinGecko calls, keeping connections alive
+# (requests already asks for gzip-encoded responses)
+COINGECKO_TIMEOUT = 10  # seconds
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 def fetch_bitcoin_price(currency: str = 'usd') -> Dict[str, Any]:
     """
     Fetch current Bitcoin price from CoinGecko API.
@@ -71,7 +161,7 @@ def fetch_bitcoin_price(currency: str = 'usd') -> Dict[str, Any]:
     url = f"https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies={currency}&include_market_cap=true&include_24hr_vol=true&include_24hr_change=true&include_last_updated_at=true"
     
     try:
-        response = requests.get(url)
+        response = _SESSION.get(url, timeout=COINGECKO_TIMEOUT)
         response.raise_for_status()  # Raise exception for HTTP errors
         data = response.json()
         
@@ -98,7 +188,7 @@ def fetch_bitcoin_historical(days: int = 1, currency: str = 'usd') -> Dict[str,
     url = f"https://api.coingecko.com/api/v3/coins/bitcoin/market_chart?vs_currency={currency}&days={days}"
     
     try:
-        response = requests.get(url)
+        response = _SESSION.get(url, timeout=COINGECKO_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         logger.info(f"Successfully fetched historical Bitcoin data for the last {days} days")
@@ -111,42 +201,100 @@ def fetch_bitcoin_historical(days: int = 1, currency: str = 'usd') -> Dict[str,
 # Redis Data Storage
 # -----------------------------------------------------------------------------
 
-def store_bitcoin_price(redis_conn: redis.Redis, price_data: Dict[str, Any], currency: str = 'usd') -> bool:
+def get_hash_fields(price_data: Dict[str, Any], currency: str = 'usd') -> Dict[str, Any]:
+    """
+    Map CoinGecko price data to the fields of the `bitcoin:data:{currency}` hash.
+    
+    Args:
+        price_data (dict): Bitcoin price data from CoinGecko API
+        currency (str): Currency of the price data (default: 'usd')
+        
+    Returns:
+        dict: Hash fields and their values
+    """
+    return dict(zip(HASH_FIELDS, (
+        price_data[currency],
+        price_data[f"{currency}_market_cap"],
+        price_data[f"{currency}_24h_vol"],
+        price_data[f"{currency}_24h_change"],
+        price_data['last_updated_at'],
+        price_data['timestamp']
+    )))
+
+def _changed(value: Any, previous: Any) -> bool:
+    if isinstance(value, (int, float)) and isinstance(previous, (int, float)):
+        return abs(value - previous) > HASH_EPSILON
+    return value != previous
+
+def store_bitcoin_price(redis_conn: redis.Redis, price_data: Dict[str, Any], currency: str = 'usd',
+                        previous_fields: Optional[Dict[str, Any]] = None,
+                        channel: Optional[str] = None, payload: Optional[str] = None) -> bool:
     """
     Store Bitcoin price data in Redis.
     
+    All writes are sent in a single MULTI/EXEC pipeline (one round-trip). The
+    history goes to compressed RedisTimeSeries series (one float sample per
+    field) when the module is available, else to a sorted set whose members
+    are the numeric fields of `HISTORY_FIELDS` joined by commas.
+    
     Args:
         redis_conn (redis.Redis): Redis connection object
         price_data (dict): Bitcoin price data from CoinGecko API
         currency (str): Currency of the price data (default: 'usd')
+        previous_fields (dict): Hash fields written by the previous call, as
+            returned by `get_hash_fields`; only fields that changed since are
+            rewritten (default: None to write all fields)
+        channel (str): Redis channel to also publish the update to in the same
+            pipeline (default: None to not publish)
+        payload (str): `price_data` already serialized to JSON, published as the
+            message (default: None to serialize here)
         
     Returns:
         bool: True if storage was successful
     """
+    fields = get_hash_fields(price_data, currency)
+    if previous_fields:
+        fields = {
+            key: value for key, value in fields.items()
+            if key not in previous_fields or _changed(value, previous_fields[key])
+        }
+    
     try:
-        # Store current price as a string
-        redis_conn.set(f"bitcoin:current_price:{currency}", price_data[currency])
-        
-        # Store timestamp of last update
-        redis_conn.set("bitcoin:last_updated", price_data['timestamp'])
-        
-        # Store all data as a hash
-        redis_conn.hset(f"bitcoin:data:{currency}", mapping={
-            'price': price_data[currency],
-            'market_cap': price_data[f"{currency}_market_cap"],
-            'volume_24h': price_data[f"{currency}_24h_vol"],
-            'change_24h': price_data[f"{currency}_24h_change"],
-            'last_updated_at': price_data['last_updated_at'],
-            'timestamp': price_data['timestamp']
-        })
-        
-        # Add to time series (using sorted set with timestamp as score)
-        redis_conn.zadd(
-            f"bitcoin:price_history:{currency}", 
-            {json.dumps(price_data): price_data['timestamp']}
-        )
+        with redis_conn.pipeline(transaction=True) as pipe:
+            # Store current price as a string
+            pipe.set(f"bitcoin:current_price:{currency}", price_data[currency])
+            
+            # Store timestamp of last update
+            pipe.set("bitcoin:last_updated", price_data['timestamp'])
+            
+            # Store all data as a hash
+            if fields:
+                pipe.hset(f"bitcoin:data:{currency}", mapping=fields)
+            
+            if has_timeseries(redis_conn):
+                # Add one sample per field (timestamps in milliseconds)
+                for field, source in TIMESERIES_FIELDS:
+                    value = price_data.get(source.format(currency=currency))
+                    if value is not None:
+                        pipe.execute_command(
+                            'TS.ADD', _timeseries_key(field, currency),
+                            price_data['timestamp'] * 1000, value, 'ON_DUPLICATE', 'LAST'
+                        )
+            else:
+                # Add to time series (using sorted set with timestamp as score)
+                pipe.zadd(
+                    f"bitcoin:price_history:{currency}", 
+                    {_encode_history_member(price_data, currency): price_data['timestamp']}
+                )
+            
+            if channel is not None:
+                pipe.publish(channel, payload if payload is not None else json.dumps(price_data))
+            
+            results = pipe.execute()
         
         logger.info(f"Successfully stored Bitcoin price data in Redis")
+        if channel is not None:
+            logger.info(f"Published price update to {results[-1]} subscribers")
         return True
     except redis.RedisError as e:
         logger.error(f"Error storing Bitcoin price data in Redis: {e}")
@@ -186,13 +334,12 @@ def get_bitcoin_data(redis_conn: redis.Redis, currency: str = 'usd') -> Dict[str
         dict: Bitcoin data including price, market cap, etc.
     """
     try:
-        data = redis_conn.hgetall(f"bitcoin:data:{currency}")
-        if data:
-            # Convert numeric values from strings
-            for key in ['price', 'market_cap', 'volume_24h', 'change_24h', 'last_updated_at', 'timestamp']:
-                if key in data:
-                    data[key] = float(data[key])
-            return data
+        values = redis_conn.hmget(f"bitcoin:data:{currency}", HASH_FIELDS)
+        present = [(key, value) for key, value in zip(HASH_FIELDS, values) if value is not None]
+        if present:
+            # Convert all numeric values from strings in one call
+            keys, raw = zip(*present)
+            return dict(zip(keys, np.asarray(raw, dtype=np.float64).tolist()))
         else:
             logger.warning("No Bitcoin data found in Redis")
             return None
@@ -215,6 +362,9 @@ def get_price_history(redis_conn: redis.Redis, start_time: int = None, end_time:
         list: List of Bitcoin price data points
     """
     try:
+        if has_timeseries(redis_conn):
+            return _get_timeseries_history(redis_conn, start_time, end_time, currency)
+        
         # Set default time range if not provided
         if start_time is None:
             start_time = '-inf'
@@ -225,15 +375,10 @@ def get_price_history(redis_conn: redis.Redis, start_time: int = None, end_time:
         result = redis_conn.zrangebyscore(
             f"bitcoin:price_history:{currency}", 
             start_time, 
-            end_time, 
-            withscores=True
+            end_time
         )
         
-        # Parse JSON data
-        history = []
-        for item, score in result:
-            data = json.loads(item)
-            history.append(data)
+        history = _decode_history_members(result, currency)
             
         logger.info(f"Retrieved {len(history)} Bitcoin price records from history")
         return history
@@ -241,12 +386,92 @@ def get_price_history(redis_conn: redis.Redis, start_time: int = None, end_time:
         logger.error(f"Error retrieving Bitcoin price history from Redis: {e}")
         raise
 
+def iter_price_history(redis_conn: redis.Redis, start_time: int = None, end_time: int = None,
+                       currency: str = 'usd', chunk: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over Bitcoin price history from Redis within a specific time range.
+    
+    Unlike `get_price_history`, the sorted-set history is read in pages of
+    `chunk` members with ZRANGEBYSCORE ... LIMIT, so long ranges can be
+    processed without holding every record in memory or blocking Redis on
+    one large reply. RedisTimeSeries history is read as a whole.
+    
+    Args:
+        redis_conn (redis.Redis): Redis connection object
+        start_time (int): Start time as Unix timestamp (default: None for no lower bound)
+        end_time (int): End time as Unix timestamp (default: None for no upper bound)
+        currency (str): Currency of the price data (default: 'usd')
+        chunk (int): Number of records fetched per request (default: 1000)
+        
+    Yields:
+        dict: Bitcoin price data points in timestamp order
+    """
+    try:
+        if has_timeseries(redis_conn):
+            yield from _get_timeseries_history(redis_conn, start_time, end_time, currency)
+            return
+        
+        if start_time is None:
+            start_time = '-inf'
+        if end_time is None:
+            end_time = '+inf'
+        
+        offset = 0
+        while True:
+            batch = redis_conn.zrangebyscore(
+                f"bitcoin:price_history:{currency}",
+                start_time,
+                end_time,
+                start=offset,
+                num=chunk
+            )
+            if not batch:
+                break
+            yield from _decode_history_members(batch, currency)
+            if len(batch) < chunk:
+                break
+            offset += chunk
+    except redis.RedisError as e:
+        logger.error(f"Error retrieving Bitcoin price history from Redis: {e}")
+        raise
+
+def _get_timeseries_history(redis_conn: redis.Redis, start_time: Optional[int], end_time: Optional[int],
+                            currency: str) -> List[Dict[str, Any]]:
+    """
+    Read the price history from the RedisTimeSeries series of each field.
+    
+    Returns the same records as the sorted-set history, keyed by CoinGecko
+    field names, so callers do not depend on the storage used.
+    """
+    start = '-' if start_time is None else int(start_time) * 1000
+    end = '+' if end_time is None else int(end_time) * 1000
+    with redis_conn.pipeline(transaction=False) as pipe:
+        for field, _ in TIMESERIES_FIELDS:
+            pipe.execute_command('TS.RANGE', _timeseries_key(field, currency), start, end)
+        ranges = pipe.execute(raise_on_error=False)
+    
+    history = {}
+    for (field, source), samples in zip(TIMESERIES_FIELDS, ranges):
+        if isinstance(samples, redis.ResponseError):
+            # Series not created yet
+            continue
+        name = source.format(currency=currency)
+        # Series hold doubles; last_updated_at is an integer epoch like on the sorted-set path
+        convert = int if name == 'last_updated_at' else float
+        for ts, value in samples:
+            record = history.setdefault(ts, {'timestamp': ts // 1000})
+            record[name] = convert(float(value))
+    
+    result = [history[ts] for ts in sorted(history) if currency in history[ts]]
+    logger.info(f"Retrieved {len(result)} Bitcoin price records from history")
+    return result
+
 # -----------------------------------------------------------------------------
 # Redis Pub/Sub for Real-time Updates
 # -----------------------------------------------------------------------------
 
 def publish_price_update(redis_conn: redis.Redis, price_data: Dict[str, Any], 
-                        channel: str = 'bitcoin_price_updates') -> int:
+                        channel: str = 'bitcoin_price_updates', message: Optional[str] = None) -> int:
     """
     Publish Bitcoin price update to a Redis channel.
     
@@ -254,12 +479,14 @@ def publish_price_update(redis_conn: redis.Redis, price_data: Dict[str, Any],
         redis_conn (redis.Redis): Redis connection object
         price_data (dict): Bitcoin price data
         channel (str): Redis channel to publish to (default: 'bitcoin_price_updates')
+        message (str): `price_data` already serialized to JSON (default: None to serialize here)
         
     Returns:
         int: Number of clients that received the message
     """
     try:
-        message = json.dumps(price_data)
+        if message is None:
+            message = json.dumps(price_data)
         receivers = redis_conn.publish(channel, message)
         logger.info(f"Published price update to {receivers} subscribers")
         return receivers
@@ -302,25 +529,24 @@ def get_price_dataframe(price_history: List[Dict[str, Any]], currency: str = 'us
     Returns:
         pd.DataFrame: DataFrame with price data
     """
-    # Extract relevant data
-    data = []
-    for item in price_history:
-        data.append({
-            'timestamp': item['timestamp'],
-            'price': item[currency],
-            'market_cap': item.get(f"{currency}_market_cap"),
-            'volume_24h': item.get(f"{currency}_24h_vol"),
-            'change_24h': item.get(f"{currency}_24h_change")
-        })
+    # Extract each field into its own typed array (missing values become NaN)
+    n = len(price_history)
+    timestamps = np.fromiter((item['timestamp'] for item in price_history), dtype=np.int64, count=n)
     
-    # Create DataFrame
-    df = pd.DataFrame(data)
+    def column(key: str) -> np.ndarray:
+        return np.array([item.get(key) for item in price_history], dtype=np.float64)
     
-    # Convert timestamp to datetime
-    df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-    
-    # Set datetime as index
-    df = df.set_index('datetime')
+    # Create DataFrame from the columns, indexed by datetime
+    df = pd.DataFrame(
+        {
+            'timestamp': timestamps,
+            'price': column(currency),
+            'market_cap': column(f"{currency}_market_cap"),
+            'volume_24h': column(f"{currency}_24h_vol"),
+            'change_24h': column(f"{currency}_24h_change")
+        },
+        index=pd.DatetimeIndex(pd.to_datetime(timestamps, unit='s'), name='datetime')
+    )
     
     return df
 
@@ -338,6 +564,37 @@ def calculate_moving_average(df: pd.DataFrame, window: int = 10, column: str = '
     """
     return df[column].rolling(window=window).mean()
 
+def calculate_moving_averages(df: pd.DataFrame, windows: Tuple[int, ...] = (10, 30),
+                              column: str = 'price') -> Dict[int, pd.Series]:
+    """
+    Calculate moving averages for several window sizes in one pass over a column.
+    
+    All windows share a single cumulative sum of the column, so each extra
+    window costs one vectorized subtraction instead of another rolling pass.
+    The result matches `calculate_moving_average` for each window.
+    
+    Args:
+        df (pd.DataFrame): DataFrame with price data
+        windows (tuple): Window sizes for the moving averages (default: (10, 30))
+        column (str): Column to calculate moving averages for (default: 'price')
+        
+    Returns:
+        dict: Moving average series keyed by window size
+    """
+    values = df[column].to_numpy(dtype=np.float64)
+    if np.isnan(values).any():
+        # A NaN would poison the cumulative sum; let pandas skip it
+        return {window: calculate_moving_average(df, window, column) for window in windows}
+    
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    moving_averages = {}
+    for window in windows:
+        ma = np.full(len(values), np.nan)
+        if window <= len(values):
+            ma[window - 1:] = (csum[window:] - csum[:-window]) / window
+        moving_averages[window] = pd.Series(ma, index=df.index, name=column)
+    return moving_averages
+
 def calculate_percent_change(df: pd.DataFrame, periods: int = 1, column: str = 'price') -> pd.Series:
     """
     Calculate percent change over a number of periods.
@@ -364,13 +621,16 @@ def detect_price_anomalies(df: pd.DataFrame, threshold: float = 2.0, column: str
     Returns:
         pd.Series: Boolean series indicating anomalies
     """
-    # Calculate Z-scores
-    z_scores = (df[column] - df[column].mean()) / df[column].std()
+    values = df[column].to_numpy(dtype=np.float64)
+    
+    # Sample mean and standard deviation (ddof=1, ignoring NaN like pandas)
+    mean = np.nanmean(values)
+    std = np.nanstd(values, ddof=1)
     
-    # Identify anomalies
-    anomalies = abs(z_scores) > threshold
+    # Identify anomalies: |z| > threshold, without materializing the Z-scores
+    anomalies = np.abs(values - mean) > threshold * std
     
-    return anomalies
+    return pd.Series(anomalies, index=df.index, name=column)
 
 # -----------------------------------------------------------------------------
 # Data Collection Helper Functions
@@ -387,28 +647,37 @@ def collect_bitcoin_data(redis_conn: redis.Redis, interval: int = 60,
         duration (int): Total duration to collect data in seconds (default: 3600)
         currency (str): Currency to fetch prices in (default: 'usd')
     """
-    start_time = time.time()
-    end_time = start_time + duration
+    # Samples are scheduled on the monotonic clock at fixed ticks, so the time
+    # spent fetching and storing does not accumulate as drift
+    next_time = time.monotonic()
+    end_time = next_time + duration
     
     logger.info(f"Starting data collection for {duration/60:.1f} minutes at {interval} second intervals")
     
-    while time.time() < end_time:
+    # Hash fields last written, so that each sample only rewrites what changed
+    last_fields = None
+    
+    while time.monotonic() < end_time:
         try:
             # Fetch Bitcoin price data
             price_data = fetch_bitcoin_price(currency)
             
-            # Store in Redis
-            store_bitcoin_price(redis_conn, price_data, currency)
+            # Serialize once for the update message
+            payload = json.dumps(price_data)
             
-            # Publish price update
-            publish_price_update(redis_conn, price_data)
-            
-            # Wait for next interval
-            time.sleep(interval)
+            # Store in Redis and publish the price update in one round-trip
+            if store_bitcoin_price(redis_conn, price_data, currency, previous_fields=last_fields,
+                                   channel='bitcoin_price_updates', payload=payload):
+                last_fields = get_hash_fields(price_data, currency)
             
         except Exception as e:
             logger.error(f"Error during data collection: {e}")
-            time.sleep(interval)  # Continue with next interval
+        
+        # Wait for next interval
+        next_time += interval
+        sleep_for = next_time - time.monotonic()
+        if sleep_for > 0:
+            time.sleep(sleep_for)
     
     logger.info("Data collection completed")
 
@@ -427,8 +696,9 @@ def prepare_price_plot_data(df: pd.DataFrame) -> Tuple[List, List, List, List]:
         tuple: (timestamps, prices, moving_avg_10, moving_avg_30)
     """
     # Calculate moving averages
-    df['ma_10'] = calculate_moving_average(df, window=10)
-    df['ma_30'] = calculate_moving_average(df, window=30)
+    moving_averages = calculate_moving_averages(df, windows=(10, 30))
+    df['ma_10'] = moving_averages[10]
+    df['ma_30'] = moving_averages[30]
     
     # Convert to lists for plotting
     timestamps = df.index.tolist()
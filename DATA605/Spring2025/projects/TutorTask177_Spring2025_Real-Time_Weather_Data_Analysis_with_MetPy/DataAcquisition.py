@@ -1,23 +1,123 @@
 # DataAcquisition.py
 
+import asyncio
+import json
+import os
+
 import requests
+from requests.adapters import HTTPAdapter
 
-def fetch_weather_data(api_key, city):
-    """Fetch real-time weather data from OpenWeatherMap API."""
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-    
-    response = requests.get(url)
+# Shared session so that repeated and concurrent requests reuse pooled
+# TCP connections instead of opening a new one per call.
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_maxsize=32))
+
+# Cache of city name -> OpenWeatherMap city ID, used by the group endpoint
+CITY_IDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "openweather_city_ids.json")
+# Maximum number of cities per group request
+GROUP_SIZE = 20
+
+def _weather_url(api_key, city):
+    return f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
+
+def _group_urls(api_key, city_ids):
+    city_ids = list(city_ids)
+    for i in range(0, len(city_ids), GROUP_SIZE):
+        ids = ",".join(str(city_id) for city_id in city_ids[i:i + GROUP_SIZE])
+        yield f"http://api.openweathermap.org/data/2.5/group?id={ids}&appid={api_key}&units=metric"
+
+def _weather_record(data):
+    return {
+        "city": data["name"],
+        "temperature_C": data["main"]["temp"],
+        "humidity_percent": data["main"]["humidity"],
+        "wind_speed_mps": data["wind"]["speed"],
+        "pressure_hPa": data["main"]["pressure"],
+        "datetime": data["dt"]
+    }
+
+def _parse_weather_response(response):
     if response.status_code == 200:
-        data = response.json()
-        weather_data = {
-            "city": data["name"],
-            "temperature_C": data["main"]["temp"],
-            "humidity_percent": data["main"]["humidity"],
-            "wind_speed_mps": data["wind"]["speed"],
-            "pressure_hPa": data["main"]["pressure"],
-            "datetime": data["dt"]
-        }
-        return weather_data
+        return _weather_record(response.json())
     else:
         print(f"Failed to retrieve data. Error code: {response.status_code}")
         return None
+
+def fetch_weather_data(api_key, city):
+    """Fetch real-time weather data from OpenWeatherMap API."""
+    response = session.get(_weather_url(api_key, city), timeout=10)
+    return _parse_weather_response(response)
+
+def get_city_ids(api_key, cities):
+    """
+    Return the OpenWeatherMap city ID of each city, as a list in the same order.
+
+    IDs are cached in CITY_IDS_FILE; a city not in the cache is looked up once
+    with a regular weather request, whose response carries its ID. A city whose
+    lookup fails is reported and left out, and is looked up again next time.
+    """
+    city_ids = {}
+    if os.path.exists(CITY_IDS_FILE):
+        with open(CITY_IDS_FILE) as f:
+            city_ids = json.load(f)
+    missing = [city for city in cities if city not in city_ids]
+    found = 0
+    for city in missing:
+        try:
+            response = session.get(_weather_url(api_key, city), timeout=10)
+            response.raise_for_status()
+            city_ids[city] = response.json()["id"]
+            found += 1
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print(f"Failed to look up the city ID of {city}: {e}")
+    if found:
+        with open(CITY_IDS_FILE, "w") as f:
+            json.dump(city_ids, f, indent=2)
+    return [city_ids[city] for city in cities if city in city_ids]
+
+def fetch_weather_batch(api_key, city_ids):
+    """
+    Fetch real-time weather data for many cities with OpenWeatherMap's group
+    endpoint, which returns up to 20 cities per request.
+
+    Returns a dict mapping each city name (as reported by the API) to its weather data.
+    """
+    results = {}
+    for url in _group_urls(api_key, city_ids):
+        response = session.get(url, timeout=10)
+        if response.status_code != 200:
+            print(f"Failed to retrieve data. Error code: {response.status_code}")
+            continue
+        for data in response.json()["list"]:
+            results[data["name"]] = _weather_record(data)
+    return results
+
+def create_async_session():
+    """
+    Create an aiohttp session for `fetch_weather_batch_async`.
+
+    Must be called from a running event loop. Connections are kept alive
+    between cycles and shared by all concurrent requests.
+    """
+    # aiohttp is only needed by the asynchronous fetch loop in auto.py
+    import aiohttp
+    connector = aiohttp.TCPConnector(limit_per_host=10, keepalive_timeout=75)
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=10))
+
+async def fetch_weather_batch_async(http_session, api_key, city_ids):
+    """Fetch weather for many cities with concurrent group requests on an event loop."""
+    import aiohttp
+
+    async def fetch_group(url):
+        try:
+            async with http_session.get(url) as response:
+                if response.status != 200:
+                    print(f"Failed to retrieve data. Error code: {response.status}")
+                    return []
+                return (await response.json())["list"]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Failed to retrieve data: {e}")
+            return []
+
+    groups = await asyncio.gather(*[fetch_group(url) for url in _group_urls(api_key, city_ids)])
+    return {data["name"]: _weather_record(data) for group in groups for data in group}
@@ -1,66 +1,116 @@
 # DataProcessing.py
 
-from metpy.units import units
-from metpy.calc import dewpoint_from_relative_humidity
+from typing import List, Union
 
-def calculate_dewpoint(temperature_celsius: float, relative_humidity_percent: float) -> float:
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray]
+
+# Magnus coefficients for saturation vapor pressure over water (Bolton, 1980)
+MAGNUS_A = 17.67
+MAGNUS_B = 243.5
+
+def _round(values: np.ndarray) -> ArrayLike:
+    """Round to one decimal place, returning a float for scalar input."""
+    rounded = np.round(values, 1)
+    return float(rounded) if np.ndim(rounded) == 0 else rounded
+
+def calculate_dewpoint(temperature_celsius: ArrayLike, relative_humidity_percent: ArrayLike) -> ArrayLike:
     """
     Calculate the dew point from temperature and relative humidity.
 
+    Uses the Magnus approximation directly in NumPy, which avoids MetPy's unit
+    handling and works on scalars or arrays. Results agree with
+    calculate_dewpoint_metpy to within a few tenths of a degree.
+
     Parameters:
-        temperature_celsius (float): Temperature in degrees Celsius.
-        relative_humidity_percent (float): Relative humidity as a percentage (0-100).
+        temperature_celsius (float or np.ndarray): Temperature in degrees Celsius.
+        relative_humidity_percent (float or np.ndarray): Relative humidity as a percentage (0-100).
 
     Returns:
-        float: Dew point in degrees Celsius, rounded to one decimal place.
+        float or np.ndarray: Dew point in degrees Celsius, rounded to one decimal place.
     """
-    temperature = temperature_celsius * units.degC
-    relative_humidity = (relative_humidity_percent / 100.0) * units.dimensionless
+    temperature = np.asarray(temperature_celsius, dtype=float)
+    relative_humidity = np.asarray(relative_humidity_percent, dtype=float) / 100.0
+    gamma = np.log(relative_humidity) + MAGNUS_A * temperature / (MAGNUS_B + temperature)
+    return _round(MAGNUS_B * gamma / (MAGNUS_A - gamma))
+
+def calculate_dewpoint_metpy(temperature_celsius: ArrayLike, relative_humidity_percent: ArrayLike) -> ArrayLike:
+    """
+    Calculate the dew point with MetPy, for validating calculate_dewpoint.
+
+    Parameters:
+        temperature_celsius (float or np.ndarray): Temperature in degrees Celsius.
+        relative_humidity_percent (float or np.ndarray): Relative humidity as a percentage (0-100).
+
+    Returns:
+        float or np.ndarray: Dew point in degrees Celsius, rounded to one decimal place.
+    """
+    from metpy.units import units
+    from metpy.calc import dewpoint_from_relative_humidity
+
+    temperature = np.asarray(temperature_celsius, dtype=float) * units.degC
+    relative_humidity = (np.asarray(relative_humidity_percent, dtype=float) / 100.0) * units.dimensionless
     dew_point = dewpoint_from_relative_humidity(temperature, relative_humidity)
-    return round(dew_point.to('degC').magnitude, 1)
+    return _round(dew_point.to('degC').magnitude)
 
-def calculate_wind_chill(temperature_celsius: float, wind_speed_mps: float) -> float:
+def calculate_wind_chill(temperature_celsius: ArrayLike, wind_speed_mps: ArrayLike) -> ArrayLike:
     """
     Calculate the wind chill based on temperature and wind speed using the standard formula.
 
+    Accepts scalars or NumPy arrays.
+
     Parameters:
-        temperature_celsius (float): Temperature in degrees Celsius.
-        wind_speed_mps (float): Wind speed in meters per second.
+        temperature_celsius (float or np.ndarray): Temperature in degrees Celsius.
+        wind_speed_mps (float or np.ndarray): Wind speed in meters per second.
 
     Returns:
-        float: Wind chill in degrees Celsius.
+        float or np.ndarray: Wind chill in degrees Celsius.
     """
-    wind_speed_kph = wind_speed_mps * 3.6
+    temperature_celsius = np.asarray(temperature_celsius, dtype=float)
+    wind_speed_kph = np.asarray(wind_speed_mps, dtype=float) * 3.6
+    # Both wind terms share the same power of the wind speed
+    v16 = np.power(wind_speed_kph, 0.16)
     wind_chill = (
         13.12 + 0.6215 * temperature_celsius
-        - 11.37 * wind_speed_kph**0.16
-        + 0.3965 * temperature_celsius * wind_speed_kph**0.16
+        - 11.37 * v16
+        + 0.3965 * temperature_celsius * v16
     )
-    return round(wind_chill, 1)
+    return _round(wind_chill)
 
-def process_weather_data(weather_data: dict) -> dict:
+def process_weather_data(weather_data: Union[dict, List[dict]]) -> Union[dict, List[dict]]:
     """
     Process the weather data to compute additional parameters like dew point and wind chill.
 
     Parameters:
-        weather_data (dict): Dictionary containing keys like 'temperature_C', 'humidity_percent',
-                             'wind_speed_mps', 'pressure_hPa', etc.
+        weather_data (dict or list of dict): Dictionary containing keys like 'temperature_C',
+                             'humidity_percent', 'wind_speed_mps', 'pressure_hPa', etc., or a
+                             list of such dictionaries (e.g. several cities or samples), which
+                             are processed together as column arrays.
 
     Returns:
-        dict: Augmented weather data with additional calculated parameters.
+        dict or list of dict: Augmented weather data with additional calculated parameters.
     """
-    temperature_C = weather_data.get("temperature_C")
-    humidity_percent = weather_data.get("humidity_percent")
-    wind_speed_mps = weather_data.get("wind_speed_mps")
-    pressure_hPa = weather_data.get("pressure_hPa")
-
-    return {
-        "city": weather_data.get("city"),
-        "datetime": weather_data.get("datetime"),
-        "temperature_C": temperature_C,
-        "humidity_percent": humidity_percent,
-        "wind_speed_mps": wind_speed_mps,
-        "pressure_hPa": pressure_hPa,
-        "dew_point_C": calculate_dewpoint(temperature_C, humidity_percent),
-        "wind_chill_C": calculate_wind_chill(temperature_C, wind_speed_mps)
-    }
+    if isinstance(weather_data, dict):
+        return process_weather_data([weather_data])[0]
+
+    temperature_C = np.array([w.get("temperature_C") for w in weather_data], dtype=float)
+    humidity_percent = np.array([w.get("humidity_percent") for w in weather_data], dtype=float)
+    wind_speed_mps = np.array([w.get("wind_speed_mps") for w in weather_data], dtype=float)
+
+    dew_point_C = np.atleast_1d(calculate_dewpoint(temperature_C, humidity_percent)).tolist()
+    wind_chill_C = np.atleast_1d(calculate_wind_chill(temperature_C, wind_speed_mps)).tolist()
+
+    return [
+        {
+            "city": w.get("city"),
+            "datetime": w.get("datetime"),
+            "temperature_C": w.get("temperature_C"),
+            "humidity_percent": w.get("humidity_percent"),
+            "wind_speed_mps": w.get("wind_speed_mps"),
+            "pressure_hPa": w.get("pressure_hPa"),
+            "dew_point_C": dew_point,
+            "wind_chill_C": wind_chill
+        }
+        for w, dew_point, wind_chill in zip(weather_data, dew_point_C, wind_chill_C)
+    ]
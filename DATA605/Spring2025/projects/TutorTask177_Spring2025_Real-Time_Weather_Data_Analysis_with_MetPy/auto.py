@@ -1,35 +1,40 @@
 # auto.py
 
-import time
+import asyncio
 from datetime import datetime
-from DataAcquisition import fetch_weather_data
+from DataAcquisition import create_async_session, fetch_weather_batch_async, get_city_ids
 from DataProcessing import process_weather_data
 from Viz import generate_visualizations
 
 API_KEY = "your_openweathermap_api_key"  # Replace with your actual API key
 CITY = "London"  # Default city
+CITIES = [CITY]  # Cities fetched (concurrently) on every cycle
 FETCH_INTERVAL = 3600  # Time interval for fetching data (in seconds, 3600s = 1 hour)
 
-def automate_data_fetching_and_processing():
+async def automate_data_fetching_and_processing():
     """Automate data fetching, processing, and visualization generation every hour."""
-    while True:
-        print(f"Fetching data at {datetime.now()}")
-        
-        # Step 1: Fetch weather data
-        weather_data = fetch_weather_data(API_KEY, CITY)
-        
-        if weather_data:
-            # Step 2: Process the weather data
-            print("Processing data...")
-            processed_data = process_weather_data(weather_data)
+    # City IDs for the group endpoint (looked up once, then cached on disk)
+    city_ids = await asyncio.to_thread(get_city_ids, API_KEY, CITIES)
+    async with create_async_session() as http_session:
+        while True:
+            print(f"Fetching data at {datetime.now()}")
+            
+            # Step 1: Fetch weather data for all cities at once (20 per request)
+            weather_by_city = await fetch_weather_batch_async(http_session, API_KEY, city_ids)
+            
+            if weather_by_city:
+                # Step 2: Process the weather data of all cities together
+                print(f"Processing data for {', '.join(weather_by_city)}...")
+                processed = process_weather_data(list(weather_by_city.values()))
 
-            # Step 3: Generate visualizations
-            print("Generating visualizations...")
-            generate_visualizations()
-        
-        # Wait for the next cycle
-        print(f"Waiting for {FETCH_INTERVAL / 60} minutes...")
-        time.sleep(FETCH_INTERVAL)
+                # Step 3: Generate visualizations
+                for processed_data in processed:
+                    print(f"Generating visualizations for {processed_data['city']}...")
+                    generate_visualizations(processed_data)
+            
+            # Wait for the next cycle
+            print(f"Waiting for {FETCH_INTERVAL / 60} minutes...")
+            await asyncio.sleep(FETCH_INTERVAL)
 
 if __name__ == "__main__":
-    automate_data_fetching_and_processing()
+    asyncio.run(automate_data_fetching_and_processing())
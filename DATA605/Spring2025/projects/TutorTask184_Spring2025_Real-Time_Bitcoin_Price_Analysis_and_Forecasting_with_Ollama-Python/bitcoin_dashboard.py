@@ -1,38 +1,118 @@
 import time
-import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
+from bitcoin_api import SESSION, REQUEST_TIMEOUT, parse_json, prices_to_series
 from ollama_API import generate_summary
 from prepare_finetune_data import fetch_prices
-from dash import Dash, dcc, html, Input, Output
+from bitcoin_summary import prompt_lines
+from dash import Dash, dcc, html, Input, Output, ctx
 import plotly.graph_objs as go
 
+# Runs the independent CoinGecko and Ollama calls of a refresh in parallel
+EXEC = ThreadPoolExecutor(max_workers=4)
+
+WINDOW_SECONDS = 3600   # span of prices shown on the dashboard
+MIN_REFETCH_SECONDS = 30
+FETCH_OVERLAP_SECONDS = 300  # re-request this much before the newest price, for late points
+
+# last hour of prices kept between refreshes, so each refresh only fetches
+# the prices added since the newest one already held
+_CACHE = {"df": None, "last_fetch": None, "cursor": None}
+_CACHE_LOCK = threading.Lock()
+
 def fetch_and_process() -> pd.DataFrame:
     """
     Fetch Bitcoin prices for the last hour and compute 15-min MA, volatility, and anomalies.
     """
-    now = int(time.time())
-    one_hour_ago = now - 3600
-    url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range"
-    params = {"vs_currency": "usd", "from": one_hour_ago, "to": now}
-    data = requests.get(url, params=params).json()["prices"]
+    with _CACHE_LOCK:
+        now = int(time.time())
+        if _CACHE["last_fetch"] is not None and now - _CACHE["last_fetch"] < MIN_REFETCH_SECONDS:
+            return _CACHE["df"]
 
-    df = pd.DataFrame(data, columns=["timestamp_ms", "price"])
-    df["timestamp"] = pd.to_datetime(df["timestamp_ms"], unit="ms")
-    df = df.set_index("timestamp").drop(columns="timestamp_ms")
+        start = _CACHE["cursor"] or now - WINDOW_SECONDS
+        url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range"
+        params = {"vs_currency": "usd", "from": start, "to": now}
+        data = parse_json(SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT))["prices"]
 
-    df["ma15"]  = df["price"].rolling("15T", min_periods=1).mean()
-    df["vol15"] = df["price"].rolling("15T", min_periods=2).std().fillna(0)
+        new = prices_to_series(data).to_frame()
+
+        # append the new prices and drop those that left the window
+        prices = new if _CACHE["df"] is None else pd.concat([_CACHE["df"][["price"]], new])
+        prices = prices[~prices.index.duplicated(keep="last")].sort_index()
+        df = prices[prices.index >= pd.to_datetime(now - WINDOW_SECONDS, unit="s")].copy()
+
+        df = _add_metrics(df)
+        _CACHE["df"], _CACHE["last_fetch"] = df, now
+        if not df.empty:
+            # advance from the newest price CoinGecko returned, not the wall clock
+            _CACHE["cursor"] = int(df.index[-1].timestamp()) - FETCH_OVERLAP_SECONDS
+        return df
+
+def _add_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the 15-min MA, volatility, and anomaly columns; the frame is bounded to one hour.
+    """
+    # one rolling window serves both statistics (std of a single price is NaN -> 0)
+    roll = df["price"].rolling("15T", min_periods=1)
+    df["ma15"]  = roll.mean()
+    df["vol15"] = roll.std().fillna(0)
 
     # anomaly when deviation > 2× rolling volatility
-    df["anomaly"] = (df["price"] - df["ma15"]).abs() > 2 * df["vol15"]
+    price, ma15, vol15 = (df[c].to_numpy() for c in ("price", "ma15", "vol15"))
+    df["anomaly"] = np.abs(price - ma15) > 2 * vol15
     return df
 
+REFRESH_SECONDS = 60
+
+# chart with price, MA15, and anomalies; built once, each refresh only
+# replaces the trace data
+_FIG = go.Figure()
+_FIG.add_trace(go.Scatter(name="Price"))
+_FIG.add_trace(go.Scatter(name="MA15"))
+# anomalies as red markers
+_FIG.add_trace(go.Scatter(mode="markers", marker=dict(color="red", size=8), name="Anomaly"))
+_FIG.update_layout(
+    title="Bitcoin Price & 15-min MA (with anomalies)",
+    xaxis_title="Time",
+    yaxis_title="USD"
+)
+
+# latest dashboard contents, written by the refresh thread
+_LAST = {"fig": _FIG, "summary": "Loading…", "forecast": ""}
+_LAST_LOCK = threading.Lock()
+_REFRESH = threading.Event()   # set to refresh before the next scheduled time
+_REFRESH_THREAD = None
+
+def _start_refresh_thread():
+    global _REFRESH_THREAD
+    with _LAST_LOCK:
+        if _REFRESH_THREAD is None:
+            _REFRESH_THREAD = threading.Thread(target=_refresh_loop, daemon=True)
+            _REFRESH_THREAD.start()
+
+def _refresh_loop():
+    """
+    Recompute the dashboard every REFRESH_SECONDS, or sooner when Refresh is clicked.
+    """
+    while True:
+        _REFRESH.clear()
+        try:
+            fig, summary, forecast = _compute_update()
+            with _LAST_LOCK:
+                _LAST.update(fig=fig, summary=summary, forecast=forecast)
+        except Exception as e:
+            print("[ERROR] dashboard refresh failed:", e)
+        _REFRESH.wait(REFRESH_SECONDS)
+
 app = Dash(__name__)
 app.layout = html.Div([
     html.H1("Real-Time Bitcoin Dashboard"),
     dcc.Graph(id="price-chart"),
     html.Button("Refresh", id="refresh-btn"),
-    dcc.Interval(id="interval", interval=60*1000, n_intervals=0),
+    # cheap poll of the cached results; the data itself refreshes every REFRESH_SECONDS
+    dcc.Interval(id="interval", interval=5*1000, n_intervals=0),
     html.Div(id="llm-summary",  style={"whiteSpace": "pre-wrap", "marginTop": "1em"}),
     html.Div(id="llm-forecast",  style={"whiteSpace": "pre-wrap", "marginTop": "1em"}),
 ])
@@ -49,47 +129,51 @@ app.layout = html.Div([
     ]
 )
 def update(n_clicks, n_intervals):
-    df = fetch_and_process()
-
-    # build chart with price, MA15, and anomalies
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df.index, y=df["price"], name="Price"))
-    fig.add_trace(go.Scatter(x=df.index, y=df["ma15"],  name="MA15"))
-    # anomalies as red markers
-    fig.add_trace(go.Scatter(
-        x=df[df.anomaly].index,
-        y=df[df.anomaly]["price"],
-        mode="markers",
-        marker=dict(color="red", size=8),
-        name="Anomaly"
-    ))
-    fig.update_layout(
-        title="Bitcoin Price & 15-min MA (with anomalies)",
-        xaxis_title="Time",
-        yaxis_title="USD"
-    )
+    # the refresh thread does the slow work, so this only returns its latest results
+    _start_refresh_thread()
+    if ctx.triggered_id == "refresh-btn":
+        _REFRESH.set()
+    with _LAST_LOCK:
+        # serialize while locked, since the refresh thread updates the figure in place
+        return _LAST["fig"].to_plotly_json(), _LAST["summary"], _LAST["forecast"]
+
+def _compute_update():
+    # both CoinGecko requests are independent, so fetch them together
+    now      = int(time.time())
+    f_df     = EXEC.submit(fetch_and_process)
+    f_series = EXEC.submit(fetch_prices, now - 12 * 300, now)
+    df       = f_df.result()
+
+    # update the chart traces with plain arrays, which skips plotly's per-element validation
+    x, price, anomaly = df.index.to_numpy(), df["price"].to_numpy(), df["anomaly"].to_numpy()
+    with _LAST_LOCK, _FIG.batch_update():
+        _FIG.data[0].update(x=x, y=price)
+        _FIG.data[1].update(x=x, y=df["ma15"].to_numpy())
+        _FIG.data[2].update(x=x[anomaly], y=price[anomaly])
 
     # LLM summary prompt
-    sample = df.iloc[::10]
-    lines = [
-        f"{ts.strftime('%H:%M')}: ${row.price:.2f}, MA15=${row.ma15:.2f}, Vol15=${row.vol15:.2f}"
-        for ts, row in sample.iterrows()
-    ]
-    prompt_summary = "Prices & metrics:\n" + "\n".join(lines) + "\n\nSummarize the trend."
-    summary = generate_summary(prompt_summary)
+    lines = prompt_lines(df)
+    prompt_summary = (
+        "Prices & metrics (MA = 15-min average, V = 15-min volatility):\n"
+        + "\n".join(lines) + "\n\nSummarize the trend."
+    )
+    f_sum = EXEC.submit(generate_summary, prompt_summary)
 
     # zero-shot forecast prompt
-    now    = int(time.time())
-    series = fetch_prices(now - 12 * 300, now)
-    vals   = series.tolist()
+    vals   = f_series.result().tolist()
     prompt_f = (
         "Here are twelve 5-minute Bitcoin prices (USD):\n"
         + ", ".join(f"{v:.2f}" for v in vals)
         + "\n\nPlease predict the next 5-minute price."
     )
-    forecast = generate_summary(prompt_f)
+    f_fc = EXEC.submit(generate_summary, prompt_f)
+
+    # the LLM calls overlap, so this waits for the slower of the two
+    summary  = f_sum.result()
+    forecast = f_fc.result()
 
-    return fig, summary, f"Forecast (next 5 min): {forecast}"
+    return _FIG, summary, f"Forecast (next 5 min): {forecast}"
 
 if __name__ == "__main__":
+    _start_refresh_thread()
     app.run(host="0.0.0.0", port=8888)
@@ -1,6 +1,6 @@
 import time
-import requests
 import pandas as pd
+from bitcoin_api import SESSION, REQUEST_TIMEOUT, parse_json, prices_to_series
 from ollama_API import generate_summary
 
 def fetch_last_hour_prices() -> pd.DataFrame:
@@ -8,31 +8,39 @@ def fetch_last_hour_prices() -> pd.DataFrame:
     one_hour_ago = now - 3600
     url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range"
     params = {"vs_currency": "usd", "from": one_hour_ago, "to": now}
-    r = requests.get(url, params=params)
+    r = SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
     r.raise_for_status()
-    prices = r.json()["prices"]     # [[ms, price], …]
+    prices = parse_json(r)["prices"]     # [[ms, price], …]
 
-    df = pd.DataFrame(prices, columns=["timestamp_ms", "price"])
-    df["timestamp"] = pd.to_datetime(df["timestamp_ms"], unit="ms")
-    df = df.set_index("timestamp").drop(columns="timestamp_ms")
+    df = prices_to_series(prices).to_frame()
 
     # compute 15-min MA & volatility
-    df["ma15"] = df["price"].rolling("15T", min_periods=1).mean()
-    df["vol15"] = df["price"].rolling("15T", min_periods=2).std().fillna(0)
+    roll = df["price"].rolling("15T", min_periods=1)
+    df["ma15"] = roll.mean()
+    df["vol15"] = roll.std().fillna(0)
     return df
 
+def prompt_lines(df: pd.DataFrame) -> list:
+    """
+    Format price, MA15 and Vol15 as compact prompt lines: one per 5 minutes,
+    rounded to whole dollars, skipping lines that repeat the previous one.
+    Fewer prompt tokens make the LLM answer faster.
+    """
+    sample = df[["price", "ma15", "vol15"]].resample("5T").last().dropna()
+    rounded = sample.round().astype("int64")
+    rounded = rounded[(rounded != rounded.shift()).any(axis=1)]
+    return [
+        f"{ts.strftime('%H:%M')}: ${row.price}, MA=${row.ma15}, V=${row.vol15}"
+        for ts, row in rounded.iterrows()
+    ]
+
 def summarize_bitcoin_last_hour() -> str:
     df = fetch_last_hour_prices()
-    sample = df.iloc[::10]   # thin out for brevity
-
-    lines = [
-        f"{ts.strftime('%H:%M')}: price=${row.price:.2f}, "
-        f"MA15=${row.ma15:.2f}, Vol15=${row.vol15:.2f}"
-        for ts, row in sample.iterrows()
-    ]
+    lines = prompt_lines(df)
 
     prompt = (
-        "Here are Bitcoin price metrics over the last hour (≈6-min intervals):\n"
+        "Here are Bitcoin price metrics over the last hour at 5-min intervals "
+        "(MA = 15-min moving average, V = 15-min volatility):\n"
         + "\n".join(lines)
         + "\n\nPlease summarize the short-term trend, highlighting moving average and volatility."
     )
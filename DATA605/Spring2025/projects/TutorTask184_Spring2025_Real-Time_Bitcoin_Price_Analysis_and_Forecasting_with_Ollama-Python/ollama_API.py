@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import ollama
 
 # Ollama app on your Mac, reachable from inside Docker
@@ -6,16 +8,23 @@ OLLAMA_API_URL = "http://host.docker.internal:11434"
 # Initialize the client (no default model here)
 client = ollama.Client(host=OLLAMA_API_URL)
 
+@lru_cache(maxsize=128)
+def _cached_generate(model: str, prompt: str) -> str:
+    """
+    Run `model` on `prompt`, reusing the response when the same prompt repeats
+    (e.g. dashboard refreshes over unchanged prices).
+    """
+    resp = client.generate(model=model, prompt=prompt)
+    return resp["response"]
+
 def generate_summary(prompt: str) -> str:
     """
     Run the base Mistral model to summarize price metrics.
     """
-    resp = client.generate(model="mistral", prompt=prompt)
-    return resp["response"]
+    return _cached_generate("mistral", prompt)
 
 def generate_forecast(prompt: str) -> str:
     """
     Zero-shot forecast using the base Mistral model.
     """
-    resp = client.generate(model="mistral", prompt=prompt)
-    return resp["response"]
+    return _cached_generate("mistral", prompt)
@@ -1,6 +1,6 @@
 import time
-import requests
 import pandas as pd
+from bitcoin_api import SESSION, REQUEST_TIMEOUT, parse_json, prices_to_series
 
 BASE_URL = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range"
 
@@ -8,15 +8,18 @@ def fetch_prices(start_ts: int, end_ts: int) -> pd.Series:
     """
     Fetch & resample Bitcoin price from `start_ts` to `end_ts` at 5-min intervals.
     """
-    r = requests.get(BASE_URL, params={
+    r = SESSION.get(BASE_URL, params={
         "vs_currency": "usd",
         "from": start_ts,
         "to": end_ts
-    })
+    }, timeout=REQUEST_TIMEOUT)
     r.raise_for_status()
-    data = r.json()["prices"]  # [[ms, price], …]
+    data = parse_json(r)["prices"]  # [[ms, price], …]
 
-    df = pd.DataFrame(data, columns=["timestamp_ms", "price"])
-    df["timestamp"] = pd.to_datetime(df["timestamp_ms"], unit="ms")
-    series = df.set_index("timestamp")["price"]
-    return series.resample("300S").ffill()
+    series = prices_to_series(data)
+    if series.empty:
+        return series
+    # same 5-min grid as resample("300S").ffill(), filled by a direct reindex
+    idx = series.index
+    target = pd.date_range(idx[0].floor("300s"), idx[-1].floor("300s"), freq="300s", name=idx.name)
+    return series.reindex(target, method="ffill")
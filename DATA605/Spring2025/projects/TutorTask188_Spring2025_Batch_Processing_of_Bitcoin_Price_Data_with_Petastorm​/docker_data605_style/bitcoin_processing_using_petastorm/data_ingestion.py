@@ -1,30 +1,47 @@
 # data_ingestion.py
+import asyncio
+import aiohttp
+import csv
 import requests
 import time
 import pandas as pd
 from datetime import datetime
 import os
 
+PRICE_PARAMS = {
+    'ids': 'bitcoin',
+    'vs_currencies': 'usd',
+    'include_market_cap': 'true',
+    'include_24hr_vol': 'true',
+    'include_24hr_change': 'true'
+}
+
+CSV_FIELDS = ['timestamp', 'price_usd', 'market_cap', 'volume_24h', 'price_change_24h']
+
 class BitcoinDataCollector:
     def __init__(self, output_dir='bitcoin_data'):
         self.base_url = "https://api.coingecko.com/api/v3"
         self.historical_data = []
+        self._csv_fp = None
+        self._csv_writer = None
+        self._last_flushed = 0
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
         
     def fetch_current_price(self):
         """Fetch current Bitcoin price in USD"""
         endpoint = f"{self.base_url}/simple/price"
-        params = {
-            'ids': 'bitcoin',
-            'vs_currencies': 'usd',
-            'include_market_cap': 'true',
-            'include_24hr_vol': 'true',
-            'include_24hr_change': 'true'
-        }
-        response = requests.get(endpoint, params=params)
-        data = response.json()
-        
+        response = requests.get(endpoint, params=PRICE_PARAMS)
+        return self._parse_price(response.json())
+    
+    async def fetch_current_price_async(self, session):
+        """Fetch current Bitcoin price in USD on an aiohttp session"""
+        endpoint = f"{self.base_url}/simple/price"
+        async with session.get(endpoint, params=PRICE_PARAMS) as response:
+            return self._parse_price(await response.json())
+    
+    @staticmethod
+    def _parse_price(data):
         return {
             'timestamp': datetime.now().isoformat(),
             'price_usd': data['bitcoin']['usd'],
@@ -42,40 +59,87 @@ class BitcoinDataCollector:
         print(f"Data saved to {filepath}")
         return filepath
     
+    def _open_csv(self, filename):
+        """Open a CSV file for appending and write the rows collected so far"""
+        filepath = os.path.join(self.output_dir, filename)
+        self._csv_fp = open(filepath, "w", newline="")
+        self._csv_writer = csv.DictWriter(self._csv_fp, fieldnames=CSV_FIELDS)
+        self._csv_writer.writeheader()
+        self._last_flushed = 0
+        self._flush_csv()
+        return filepath
+    
+    def _flush_csv(self):
+        """Append the rows collected since the last flush to the open CSV file"""
+        self._csv_writer.writerows(self.historical_data[self._last_flushed:])
+        self._csv_fp.flush()
+        self._last_flushed = len(self.historical_data)
+    
+    def _close_csv(self):
+        self._flush_csv()
+        self._csv_fp.close()
+        self._csv_fp = self._csv_writer = None
+    
     def collect_data(self, interval=3600, duration=24, save_interval=24):
         """
         Collect data at regular intervals for a specified duration
         
+        Fetching and saving run as separate coroutines connected by a queue,
+        so slow CSV writes never delay the next fetch. Rows are appended to
+        a single CSV file as they are flushed rather than rewriting the whole
+        history every `save_interval` fetches.
+        
         Args:
             interval: seconds between data fetches (default: 3600 = 1 hour)
             duration: hours to collect data (default: 24 hours)
             save_interval: save to CSV every X fetches (default: 24)
         """
-        end_time = time.time() + duration * 3600
-        fetch_count = 0
-        
-        while time.time() < end_time:
-            try:
-                price_data = self.fetch_current_price()
-                self.historical_data.append(price_data)
-                fetch_count += 1
-                print(f"Collected data at {price_data['timestamp']}")
-                
-                # Save to CSV at specified intervals
-                if fetch_count % save_interval == 0:
-                    df = pd.DataFrame(self.historical_data)
-                    self.save_to_csv(df)
-                
-            except Exception as e:
-                print(f"Error fetching data: {e}")
-            
-            time.sleep(interval)
+        csv_path = self._open_csv("bitcoin_prices_final.csv")
+        try:
+            asyncio.run(self._collect(interval, duration * 3600, save_interval))
+        finally:
+            # Write whatever is left since the last periodic flush
+            self._close_csv()
+        print(f"Data saved to {csv_path}")
         
-        # Save final data
         df = pd.DataFrame(self.historical_data)
-        csv_path = self.save_to_csv(df, "bitcoin_prices_final.csv")
         return df, csv_path
 
+    async def _collect(self, interval, duration_s, save_interval):
+        queue = asyncio.Queue()
+        await asyncio.gather(
+            self._fetch_loop(queue, interval, time.monotonic() + duration_s),
+            self._flush_loop(queue, save_interval),
+        )
+    
+    async def _fetch_loop(self, queue, interval, end_time):
+        """Fetch a price every `interval` seconds until `end_time` and queue it"""
+        timeout = aiohttp.ClientTimeout(total=min(30, interval))
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            next_fetch = time.monotonic()
+            while next_fetch < end_time:
+                try:
+                    await queue.put(await self.fetch_current_price_async(session))
+                except Exception as e:
+                    print(f"Error fetching data: {e}")
+                
+                # Fetches are scheduled on fixed ticks, independent of their latency
+                next_fetch += interval
+                await asyncio.sleep(max(0, min(next_fetch, end_time) - time.monotonic()))
+        await queue.put(None)
+    
+    async def _flush_loop(self, queue, save_interval):
+        """Collect queued prices and save them to CSV every `save_interval` fetches"""
+        fetch_count = 0
+        while (price_data := await queue.get()) is not None:
+            self.historical_data.append(price_data)
+            fetch_count += 1
+            print(f"Collected data at {price_data['timestamp']}")
+            
+            # Append new rows to the CSV at specified intervals, off the event loop
+            if fetch_count % save_interval == 0:
+                await asyncio.to_thread(self._flush_csv)
+
 def test_data_ingestion():
     """Test function for data ingestion module"""
     print("=== Testing Data Ingestion ===")
@@ -1,8 +1,43 @@
 # data_processing.py
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
 
+def _window_sums(values, window):
+    """Sum of each trailing `window` of `values` from one prefix sum (first window-1 are NaN)"""
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    sums = np.full(len(values), np.nan)
+    sums[window - 1:] = csum[window:] - csum[:-window]
+    return sums
+
+def rolling_mean_std(series, window):
+    """
+    Rolling mean and sample standard deviation of `series` over fixed windows
+    
+    Equivalent to `series.rolling(window).mean()` / `.std()`: windows that are
+    incomplete or contain NaN give NaN. Both statistics come from prefix sums
+    of the values and their squares, so each costs O(N) vectorized adds.
+    """
+    x = series.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(x)
+    # Centre the values so the sum of squares does not lose precision
+    centre = x[valid].mean() if valid.any() else 0.0
+    d = np.where(valid, x - centre, 0.0)
+    
+    count = _window_sums(valid.astype(np.float64), window)
+    s1 = _window_sums(d, window)
+    s2 = _window_sums(d * d, window)
+    full = count == window
+    
+    mean = np.where(full, s1 / window + centre, np.nan)
+    if window > 1:
+        var = np.maximum(s2 - s1 * s1 / window, 0.0) / (window - 1)
+        std = np.where(full, np.sqrt(var), np.nan)
+    else:
+        std = np.full(len(x), np.nan)
+    return pd.Series(mean, index=series.index), pd.Series(std, index=series.index)
+
 class BitcoinAnalyzer:
     def __init__(self, data):
         self.data = data
@@ -18,12 +53,12 @@ class BitcoinAnalyzer:
     
     def calculate_moving_average(self, window=7):
         """Calculate moving average"""
-        self.df[f'ma_{window}'] = self.df['price_usd'].rolling(window=window).mean()
+        self.df[f'ma_{window}'], _ = rolling_mean_std(self.df['price_usd'], window)
         return self.df
     
     def calculate_volatility(self, window=7):
         """Calculate rolling volatility"""
-        self.df[f'volatility_{window}'] = self.df['price_usd'].pct_change().rolling(window=window).std()
+        _, self.df[f'volatility_{window}'] = rolling_mean_std(self.df['price_usd'].pct_change(), window)
         return self.df
     
     def plot_price_trend(self):
@@ -1,17 +1,13 @@
-from pyspark.sql import SparkSession
 from petastorm.unischema import Unischema, UnischemaField
 from petastorm.codecs import ScalarCodec
-from petastorm.etl.dataset_metadata import materialize_dataset
 from petastorm import make_batch_reader
 import numpy as np
 import os
+import shutil
 import pandas as pd
-
-# Initialize Spark session (moved to top level)
-spark = SparkSession.builder \
-    .appName("BitcoinDataStorage") \
-    .config("spark.sql.execution.arrow.pyspark.enabled", "true") \
-    .getOrCreate()
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 # Define schema for Bitcoin price data
 BitcoinSchema = Unischema('BitcoinSchema', [
@@ -22,33 +18,50 @@ BitcoinSchema = Unischema('BitcoinSchema', [
     UnischemaField('price_change_24h', np.float32, (), ScalarCodec(np.float32), False),
 ])
 
+# Arrow schema of the Parquet files, matching BitcoinSchema
+ArrowBitcoinSchema = pa.schema([
+    ('timestamp', pa.string()),
+    ('price_usd', pa.float32()),
+    ('market_cap', pa.float64()),
+    ('volume_24h', pa.float64()),
+    ('price_change_24h', pa.float32()),
+])
+
 def save_to_parquet(df, output_dir='file:///docker_data605_style/bitcoin_processing_using_petastorm/data'):
-    """Save DataFrame to Parquet format using Petastorm"""
-    # Ensure directory exists
-    if output_dir.startswith('file://'):
-        os.makedirs(output_dir[7:], exist_ok=True)
+    """
+    Save DataFrame to Parquet format readable by Petastorm's make_batch_reader
+    
+    The columns are written with pyarrow directly, which avoids starting a
+    Spark session and converting the rows to Spark for a plain Parquet write.
+    """
+    path = output_dir[7:] if output_dir.startswith('file://') else output_dir
     
-    # Write data
-    with materialize_dataset(spark, output_dir, BitcoinSchema, row_group_size_mb=5):
-        # Convert DataFrame to dictionary of numpy arrays
-        data_dict = {
-            'timestamp': df['timestamp'].values,
-            'price_usd': df['price_usd'].values.astype(np.float32),
-            'market_cap': df['market_cap'].values.astype(np.float64),
-            'volume_24h': df['volume_24h'].values.astype(np.float64),
-            'price_change_24h': df['price_change_24h'].values.astype(np.float32),
-        }
-        
-        # Create Spark DataFrame from dictionary
-        spark_df = spark.createDataFrame(pd.DataFrame(data_dict))
-        
-        # Write to Parquet
-        spark_df.write \
-            .mode('overwrite') \
-            .parquet(output_dir)
+    # Replace any previous dataset, as Spark's overwrite mode did
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.makedirs(path, exist_ok=True)
+    
+    # Convert DataFrame to dictionary of typed numpy arrays
+    data_dict = {
+        'timestamp': df['timestamp'].astype(str).values,
+        'price_usd': df['price_usd'].values.astype(np.float32),
+        'market_cap': df['market_cap'].values.astype(np.float64),
+        'volume_24h': df['volume_24h'].values.astype(np.float64),
+        'price_change_24h': df['price_change_24h'].values.astype(np.float32),
+    }
+    
+    # Write to Parquet
+    table = pa.table(data_dict, schema=ArrowBitcoinSchema)
+    pq.write_table(table, os.path.join(path, 'part-00000.parquet'),
+                   compression='zstd', row_group_size=100_000)
     
     print(f"Data saved to {output_dir}")
 
+def count_parquet_rows(input_dir='file:///docker_data605_style/bitcoin_processing_using_petastorm/data'):
+    """Number of rows in a Parquet dataset, read from the file footers only"""
+    path = input_dir[7:] if input_dir.startswith('file://') else input_dir
+    return ds.dataset(path, format='parquet').count_rows()
+
 def load_from_parquet(input_dir='file:///docker_data605_style/bitcoin_processing_using_petastorm/data'):
     """Load data from Parquet using Petastorm reader"""
     with make_batch_reader(input_dir) as reader:
@@ -84,5 +97,4 @@ def test_data_storage():
             print(f"{field}: {batch[field]}")
 
 if __name__ == "__main__":
-    test_data_storage()
-    spark.stop()
\ No newline at end of file
+    test_data_storage()
\ No newline at end of file
@@ -1,17 +1,14 @@
 # main.py
 from data_ingestion import BitcoinDataCollector
-from data_storage import save_to_parquet, load_from_parquet
+from data_storage import ArrowBitcoinSchema, count_parquet_rows, save_to_parquet, load_from_parquet
 from data_processing import BitcoinAnalyzer
 from ml_integration import BitcoinPricePredictor
-from pyspark.sql import SparkSession
+import numpy as np
 import pandas as pd
 
+DATA_DIR = 'file:///bitcoin_data'
+
 def main():
-    # Initialize Spark session (required for Petastorm)
-    spark = SparkSession.builder \
-        .appName("BitcoinPriceAnalysis") \
-        .getOrCreate()
-    
     # Step 1: Data Collection
     print("Starting data collection...")
     collector = BitcoinDataCollector()
@@ -19,24 +16,25 @@ def main():
     
     # Step 2: Data Storage
     print("\nSaving data to Parquet format...")
-    save_to_parquet(bitcoin_df, output_dir='file:///bitcoin_data')
+    save_to_parquet(bitcoin_df, output_dir=DATA_DIR)
     
     # Step 3: Data Analysis
     print("\nAnalyzing data...")
-    # Load data using Petastorm
-    data_batches = list(load_from_parquet())
-    all_data = []
-    for batch in data_batches:
-        batch_df = pd.DataFrame({
-            'timestamp': batch['timestamp'],
-            'price_usd': batch['price_usd'],
-            'market_cap': batch['market_cap'],
-            'volume_24h': batch['volume_24h'],
-            'price_change_24h': batch['price_change_24h'],
-        })
-        all_data.append(batch_df)
+    # Load data using Petastorm, filling one preallocated array per column
+    # instead of concatenating a DataFrame per batch
+    total_rows = count_parquet_rows(DATA_DIR)
+    columns = {
+        field.name: np.empty(total_rows, dtype=field.type.to_pandas_dtype())
+        for field in ArrowBitcoinSchema
+    }
+    offset = 0
+    for batch in load_from_parquet(DATA_DIR):
+        n = len(batch.price_usd)
+        for name, column in columns.items():
+            column[offset:offset + n] = getattr(batch, name)
+        offset += n
     
-    combined_df = pd.concat(all_data)
+    combined_df = pd.DataFrame(columns, copy=False)
     analyzer = BitcoinAnalyzer(combined_df)
     analyzer.generate_report()
     
@@ -44,8 +42,6 @@ def main():
     print("\nTraining prediction model...")
     predictor = BitcoinPricePredictor()
     model, train_predict, test_predict = predictor.train_and_evaluate(epochs=10)
-    
-    spark.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,36 +1,68 @@
 # ml_integration.py
+import os
 import numpy as np
 import pandas as pd
+import pyarrow.dataset as ds
 import tensorflow as tf
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics import mean_squared_error
-from petastorm import make_batch_reader
+
+# Arguments that keep Keras on the fused cuDNN LSTM kernel when a GPU is present;
+# dropout stays in separate layers since in-cell dropout disables that kernel
+CUDNN_LSTM_ARGS = dict(
+    activation='tanh',
+    recurrent_activation='sigmoid',
+    recurrent_dropout=0.0,
+    unroll=False,
+    use_bias=True
+)
+
+# Half-precision compute only pays off on a GPU; on CPU it is slower than float32
+MIXED_PRECISION = bool(tf.config.list_physical_devices('GPU'))
 
 class BitcoinPricePredictor:
-    def __init__(self, data_path='file:///bitcoin_data'):
+    def __init__(self, data_path='file:///bitcoin_data', scaler_path=None):
         self.data_path = data_path
+        self.scaler_path = scaler_path
         self.scaler = MinMaxScaler(feature_range=(0, 1))
+    
+    def save_scaler(self, path):
+        """Save the fitted price range of the scaler"""
+        np.save(path, [self.scaler.data_min_[0], self.scaler.data_max_[0]])
+    
+    def load_scaler(self, path):
+        """Restore the scaler from a price range saved with save_scaler"""
+        data_min, data_max = np.load(path)
+        self.scaler.fit([[data_min], [data_max]])
+    
+    def scale_prices(self, prices):
+        """Scale prices with the fitted range as one NumPy expression"""
+        data_min, data_max = self.scaler.data_min_[0], self.scaler.data_max_[0]
+        return (prices - data_min) / (data_max - data_min)
         
     def load_and_prepare_data(self, look_back=60, test_size=0.2):
         """Load data and prepare for LSTM model"""
-        # Load data using Petastorm
-        with make_batch_reader(self.data_path) as reader:
-            data = next(reader)
-        
-        prices = data['price_usd'].numpy()
-        prices = prices.reshape(-1, 1)
+        # Only the price column is needed, so read just that column of the
+        # Parquet files with pyarrow instead of whole batches through Petastorm
+        path = self.data_path[7:] if self.data_path.startswith('file://') else self.data_path
+        table = ds.dataset(path, format='parquet').to_table(columns=['price_usd'])
+        prices = table.column('price_usd').to_numpy().reshape(-1, 1)
         
-        # Scale data
-        scaled_data = self.scaler.fit_transform(prices)
+        # Scale data, reusing a saved price range when there is one
+        if self.scaler_path and os.path.exists(self.scaler_path):
+            self.load_scaler(self.scaler_path)
+            scaled_data = self.scale_prices(prices)
+        else:
+            scaled_data = self.scaler.fit_transform(prices)
+            if self.scaler_path:
+                self.save_scaler(self.scaler_path)
         
-        # Create dataset for LSTM
-        X, y = [], []
-        for i in range(look_back, len(scaled_data)):
-            X.append(scaled_data[i-look_back:i, 0])
-            y.append(scaled_data[i, 0])
-        
-        X, y = np.array(X), np.array(y)
-        X = np.reshape(X, (X.shape[0], X.shape[1], 1))
+        # Create dataset for LSTM: each sample is the look_back prices before
+        # its target, taken as a strided view rather than copied slice by slice
+        flat = scaled_data[:, 0]
+        windows = np.lib.stride_tricks.sliding_window_view(flat, look_back)
+        X = windows[:-1, :, None]
+        y = flat[look_back:]
         
         # Split into train and test
         split = int(len(X) * (1 - test_size))
@@ -41,26 +73,45 @@ class BitcoinPricePredictor:
     
     def build_lstm_model(self, look_back):
         """Build LSTM model for price prediction"""
+        # The hidden layers compute in float16 on GPU; the output layer stays
+        # float32 so the loss is computed at full precision
+        policy = 'mixed_float16' if MIXED_PRECISION else 'float32'
         model = tf.keras.Sequential([
-            tf.keras.layers.LSTM(50, return_sequences=True, input_shape=(look_back, 1)),
-            tf.keras.layers.Dropout(0.2),
-            tf.keras.layers.LSTM(50, return_sequences=False),
-            tf.keras.layers.Dropout(0.2),
-            tf.keras.layers.Dense(1)
+            tf.keras.layers.LSTM(50, return_sequences=True, input_shape=(look_back, 1),
+                                 dtype=policy, **CUDNN_LSTM_ARGS),
+            tf.keras.layers.Dropout(0.2, dtype=policy),
+            tf.keras.layers.LSTM(50, return_sequences=False, dtype=policy, **CUDNN_LSTM_ARGS),
+            tf.keras.layers.Dropout(0.2, dtype=policy),
+            tf.keras.layers.Dense(1, dtype='float32')
         ])
         
-        model.compile(optimizer='adam', loss='mean_squared_error')
+        optimizer = tf.keras.optimizers.Adam()
+        if MIXED_PRECISION:
+            # Scale the loss so small float16 gradients do not underflow
+            optimizer = tf.keras.mixed_precision.LossScaleOptimizer(optimizer)
+        model.compile(optimizer=optimizer, loss='mean_squared_error')
         return model
     
     def train_and_evaluate(self, look_back=60, epochs=20, batch_size=32):
         """Train and evaluate the model"""
         X_train, X_test, y_train, y_test = self.load_and_prepare_data(look_back)
         
+        # Input pipelines keep the tensors cached after the first epoch and
+        # prepare the next batch while the current one trains
+        train_ds = (tf.data.Dataset.from_tensor_slices((X_train, y_train))
+                    .cache()
+                    .shuffle(len(X_train))
+                    .batch(batch_size)
+                    .prefetch(tf.data.AUTOTUNE))
+        val_ds = (tf.data.Dataset.from_tensor_slices((X_test, y_test))
+                  .batch(batch_size)
+                  .cache()
+                  .prefetch(tf.data.AUTOTUNE))
+        
         model = self.build_lstm_model(look_back)
-        model.fit(X_train, y_train, 
-                 epochs=epochs, 
-                 batch_size=batch_size,
-                 validation_data=(X_test, y_test))
+        model.fit(train_ds,
+                 epochs=epochs,
+                 validation_data=val_ds)
         
         # Make predictions
         train_predict = model.predict(X_train)
@@ -5,6 +5,7 @@ from aws_cdk import (
     aws_s3 as s3,
     aws_lambda as _lambda,
     aws_dynamodb as dynamodb,
+    aws_sqs as sqs,
     aws_lambda_event_sources as sources,
     RemovalPolicy,
     Duration,
@@ -23,7 +24,7 @@ class BitcoinCdkStack(Stack):
             self, 
             "BitcoinStream",
             stream_name="bitcoin-stream",
-            shard_count=1,
+            shard_count=4,
             retention_period=Duration.hours(24),
         )
 
@@ -45,9 +46,18 @@ class BitcoinCdkStack(Stack):
                 name="id", 
                 type=dynamodb.AttributeType.STRING
             ),
+            # per-record markers written by the Lambda expire on their own
+            time_to_live_attribute="expires_at",
             removal_policy=RemovalPolicy.DESTROY,
         )
 
+        # Queue receiving the metadata of batches that still fail after all retries
+        failure_queue = sqs.Queue(
+            self,
+            "BitcoinStreamFailures",
+            retention_period=Duration.days(14),
+        )
+
         # Create Lambda function
         lambda_function = _lambda.Function(
             self, 
@@ -62,11 +72,20 @@ class BitcoinCdkStack(Stack):
             timeout=Duration.seconds(30),
         )
 
-        # Add Kinesis stream as event source for Lambda
+        # Add Kinesis stream as event source for Lambda; records are batched for
+        # up to 5 s, each shard is processed by up to 4 concurrent invocations,
+        # and a failing batch is split in half on retry instead of re-driven whole.
+        # A batch still failing after 3 retries is reported to the failure queue
+        # and skipped, so a poison record cannot block its shard until it expires.
         lambda_function.add_event_source(sources.KinesisEventSource(
             stream,
             starting_position=_lambda.StartingPosition.LATEST,
-            batch_size=1,
+            batch_size=100,
+            max_batching_window=Duration.seconds(5),
+            parallelization_factor=4,
+            bisect_batch_on_error=True,
+            retry_attempts=3,
+            on_failure=sources.SqsDlq(failure_queue),
         ))
 
         # Grant permissions
@@ -1,20 +1,103 @@
 import base64
 import json
 import boto3
-import uuid
+from botocore.config import Config
+from botocore.exceptions import ClientError
 import os
+import random
+import time
 from datetime import datetime
 from decimal import Decimal 
 
-# Set up clients
-dynamodb = boto3.resource('dynamodb')
-s3 = boto3.client('s3')
+# Set up clients once per Lambda container, so warm invocations reuse them
+client_config = Config(
+    max_pool_connections=32,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    tcp_keepalive=True
+)
+dynamodb = boto3.resource('dynamodb', config=client_config)
+s3 = boto3.client('s3', config=client_config)
 
 # Constants
 table = dynamodb.Table(os.environ['TABLE_NAME'])
 bucket_name = os.environ['BUCKET_NAME']
+AGGREGATE_KEY = {'id': 'btc_high_avg'}
+# Markers of counted records outlive the stream's 24 h retention, after
+# which no retry can deliver the record again
+MARKER_TTL = 2 * 24 * 3600  # seconds
+# TransactWriteItems takes at most 100 items: the markers plus the aggregate
+TRANSACT_CHUNK = 99
+MAX_TRANSACT_ATTEMPTS = 5
+TRANSACT_RETRY_DELAY = 0.05  # seconds, doubled on each conflict retry
+
+def count_new_records(records):
+    """
+    Add the prices of records not counted before to the high-price aggregate.
+
+    `records` are (event ID, price) pairs; the Kinesis event ID (shard and
+    sequence number) identifies a record across all deliveries.
+
+    Each record's marker is put, on condition that it does not exist yet, in
+    the same transaction as the ADD, so a record delivered again by a retry
+    (or by a bisected batch) is never counted twice. Returns the number of
+    records newly counted.
+    """
+    counted = 0
+    for i in range(0, len(records), TRANSACT_CHUNK):
+        chunk = records[i:i + TRANSACT_CHUNK]
+        attempts = 0
+        while chunk:
+            expires_at = int(time.time()) + MARKER_TTL
+            items = [
+                {'Put': {
+                    'TableName': table.name,
+                    'Item': {'id': f"record#{event_id}", 'expires_at': expires_at},
+                    'ConditionExpression': 'attribute_not_exists(id)',
+                }}
+                for event_id, _ in chunk
+            ]
+            items.append({'Update': {
+                'TableName': table.name,
+                'Key': AGGREGATE_KEY,
+                'UpdateExpression': 'ADD #c :n, #t :p',
+                'ExpressionAttributeNames': {'#c': 'count', '#t': 'total'},
+                'ExpressionAttributeValues': {
+                    ':n': len(chunk),
+                    ':p': sum((price for _, price in chunk), Decimal('0')),
+                },
+            }})
+            try:
+                dynamodb.meta.client.transact_write_items(TransactItems=items)
+            except ClientError as e:
+                attempts += 1
+                if (e.response['Error']['Code'] != 'TransactionCanceledException'
+                        or attempts >= MAX_TRANSACT_ATTEMPTS):
+                    raise
+                # drop the records already counted and retry the rest; on a
+                # conflict with a concurrent invocation nothing is dropped
+                reasons = e.response.get('CancellationReasons', [])
+                # one reason per marker plus the aggregate update; without
+                # them the counted records can't be told apart
+                if len(reasons) != len(chunk) + 1:
+                    raise
+                chunk = [
+                    record for record, reason in zip(chunk, reasons)
+                    if reason.get('Code') != 'ConditionalCheckFailed'
+                ]
+                if any(reason.get('Code') == 'TransactionConflict' for reason in reasons):
+                    # back off with jitter so concurrent shard invocations
+                    # updating the aggregate stop colliding
+                    time.sleep(random.uniform(0, TRANSACT_RETRY_DELAY * 2 ** attempts))
+                continue
+            counted += len(chunk)
+            break
+    return counted
 
 def lambda_handler(event, context):
+    high_records = []
+    # (event ID, price) of each high-price record, for the aggregate
+    high_prices = []
+
     for record in event['Records']:
         # Decode the base64-encoded Kinesis data
         payload = base64.b64decode(record['kinesis']['data']).decode('utf-8')
@@ -28,36 +111,35 @@ def lambda_handler(event, context):
             data['flag'] = 'High Price'
             data['processed_at'] = datetime.utcnow().isoformat()
 
-            # Aggregation fix with Decimal
-            agg_id = 'btc_high_avg'
-            response = table.get_item(Key={'id': agg_id})
-            item = response.get('Item', {'id': agg_id, 'count': 0, 'total': Decimal('0.0')})
-
-            new_count = item['count'] + 1
-            new_total = item['total'] + Decimal(str(price))
-            new_avg = new_total / new_count
-
-            table.put_item(Item={
-                'id': agg_id,
-                'count': new_count,
-                'total': new_total,
-                'average': new_avg
-            })
-
-            # Store in S3
-            file_key = f"bitcoin-records/{uuid.uuid4()}.json"
-            s3.put_object(
-                Bucket=bucket_name,
-                Key=file_key,
-                Body=json.dumps(data),
-                ContentType='application/json'
-            )
-
-            print(f"📦 Stored in S3: {file_key}")
-            print(f"📊 Updated avg (high only): ${round(float(new_avg), 2)} after {new_count} records")
+            high_records.append(data)
+            high_prices.append((record['eventID'], Decimal(str(price))))
         else:
             print(f" Skipped price: ${price}")
 
+    if high_records:
+        # Store the batch's records in S3 as a single JSON-lines object. The key
+        # is the batch's shard and first sequence number, so a retried batch
+        # overwrites its object, and the first half of a bisected batch
+        # replaces its parent's object while the second half gets its own.
+        first = event['Records'][0]
+        shard_id = first['eventID'].split(':')[0]
+        file_key = f"bitcoin-records/{shard_id}/{first['kinesis']['sequenceNumber']}.jsonl"
+        s3.put_object(
+            Bucket=bucket_name,
+            Key=file_key,
+            Body='\n'.join(json.dumps(r) for r in high_records),
+            ContentType='application/x-ndjson'
+        )
+        print(f"📦 Stored {len(high_records)} records in S3: {file_key}")
+
+        # The aggregate keeps a count and total; the average is total / count
+        counted = count_new_records(high_prices)
+        totals = table.get_item(Key=AGGREGATE_KEY, ConsistentRead=True).get('Item')
+        if totals:
+            new_avg = totals['total'] / totals['count']
+            print(f"📊 Updated avg (high only): ${round(float(new_avg), 2)} after {totals['count']} records "
+                  f"({counted} new)")
+
     return {
         'statusCode': 200,
         'body': 'Processed successfully'
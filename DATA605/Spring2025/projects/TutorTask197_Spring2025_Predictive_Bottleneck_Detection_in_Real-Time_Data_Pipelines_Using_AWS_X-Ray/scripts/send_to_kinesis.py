@@ -13,33 +13,76 @@ from fetch_bitcoin import fetch_bitcoin_price
 kinesis_client = create_kinesis_client()
 stream_name = 'bitcoin-stream'  
 
+SAMPLE_INTERVAL = 30    # seconds between price samples
+BATCH_SIZE = 4          # samples sent per put_records call
+MAX_BATCH_DELAY = 30    # seconds a sample may wait in the buffer before a send
+MAX_BUFFERED = 500      # put_records limit; older samples are dropped beyond it
+MAX_SEND_ATTEMPTS = 3
+
+def send_records(records):
+    """
+    Send records to Kinesis in a single put_records call.
+
+    Records the stream rejects (e.g. when throttled) are resent, up to
+    MAX_SEND_ATTEMPTS times. Returns the records that could not be sent.
+    """
+    # Records are independent, so keying by timestamp spreads them over all shards
+    entries = [
+        {'Data': json.dumps(record), 'PartitionKey': str(record['timestamp'])}
+        for record in records
+    ]
+    for attempt in range(MAX_SEND_ATTEMPTS):
+        response = kinesis_client.put_records(StreamName=stream_name, Records=entries)
+        if response['FailedRecordCount'] == 0:
+            return []
+
+        # put_records results are in request order; keep only the failed entries
+        failed = [i for i, result in enumerate(response['Records']) if 'ErrorCode' in result]
+        records = [records[i] for i in failed]
+        entries = [entries[i] for i in failed]
+        if attempt < MAX_SEND_ATTEMPTS - 1:
+            time.sleep(2 ** attempt)
+    return records
+
 def send_bitcoin_price_to_kinesis():
     """
-    Fetch Bitcoin price and send it to Kinesis.
+    Fetch the Bitcoin price every SAMPLE_INTERVAL seconds and send the
+    samples to Kinesis in batches of up to BATCH_SIZE, or sooner once the
+    oldest buffered sample has waited MAX_BATCH_DELAY seconds. Samples
+    Kinesis rejects stay buffered for the next send.
     """
+    buffer = []
+    oldest = None  # monotonic time the buffered records started waiting
     while True:
         try:
             price = fetch_bitcoin_price()
             timestamp = int(time.time())
 
-            record = {
+            buffer.append({
                 'asset': 'bitcoin',
                 'price_usd': price,
                 'timestamp': timestamp
-            }
-
-            kinesis_client.put_record( 
-                StreamName=stream_name,
-                Data=json.dumps(record),
-                PartitionKey='bitcoin'
-            )
+            })
+            if oldest is None:
+                oldest = time.monotonic()
+            # samples stay buffered if sending fails, so cap what is kept
+            if len(buffer) > MAX_BUFFERED:
+                print(f"❌ Error: buffer full, dropping {len(buffer) - MAX_BUFFERED} oldest records")
+                buffer = buffer[-MAX_BUFFERED:]
 
-            print(f"✅ Sent record: {record}")
+            if len(buffer) >= BATCH_SIZE or time.monotonic() - oldest >= MAX_BATCH_DELAY:
+                failed = send_records(buffer)
+                print(f"✅ Sent {len(buffer) - len(failed)} records, last: {buffer[-1]}")
+                if failed:
+                    print(f"❌ Error: {len(failed)} records were rejected by Kinesis, keeping them for the next send")
+                # rejected records are resent first, ahead of newer samples
+                buffer = failed
+                oldest = time.monotonic() if failed else None
 
         except Exception as e:
             print(f"❌ Error: {e}")
 
-        time.sleep(30)
+        time.sleep(SAMPLE_INTERVAL)
 
 if __name__ == "__main__":
     send_bitcoin_price_to_kinesis()
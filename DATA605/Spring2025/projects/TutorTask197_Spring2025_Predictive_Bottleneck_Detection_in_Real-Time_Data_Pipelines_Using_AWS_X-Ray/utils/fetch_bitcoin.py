@@ -1,11 +1,22 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared session so each poll reuses the CoinGecko connection
+# instead of opening a new one.
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=1, status_forcelist=[429, 502, 503, 504])
+))
 
 def fetch_bitcoin_price():
     """
     Fetch the current Bitcoin price from CoinGecko API.
     """
     url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"
-    response = requests.get(url)
+    response = _SESSION.get(url, timeout=(3.05, 10))
     response.raise_for_status()  # Raise error for bad responses
     data = response.json()
     return data['bitcoin']['usd']
@@ -1,7 +1,22 @@
 import boto3
+from botocore.config import Config
+
+# Clients are cached per region, so repeated calls reuse one client and its
+# connection pool instead of rebuilding the endpoint and signing setup
+_clients = {}
 
 def create_kinesis_client(region_name='us-east-1'):
     """
-    Create a boto3 Kinesis client.
+    Create a boto3 Kinesis client, or return the one already created for the region.
+
+    The connection pool is kept warm across batches and throttled calls are
+    retried with adaptive backoff.
     """
-    return boto3.client('kinesis', region_name=region_name)
+    if region_name not in _clients:
+        config = Config(
+            max_pool_connections=32,
+            retries={'mode': 'adaptive', 'max_attempts': 5},
+            tcp_keepalive=True
+        )
+        _clients[region_name] = boto3.client('kinesis', region_name=region_name, config=config)
+    return _clients[region_name]
@@ -1,7 +1,39 @@
+import numpy as np
 import pandas as pd
 from config.clickhouse_client import client
 
 
+def _rolling_mean_std(prices: np.ndarray, window: int):
+    """
+    Rolling mean and sample standard deviation over a trailing window.
+
+    Matches pandas' rolling(window).mean()/std(): windows that are incomplete
+    or contain NaN give NaN. Both statistics come from prefix sums of the
+    prices and their squares, so the cost is O(N) whatever the window size.
+    """
+    valid = ~np.isnan(prices)
+    # Centre the prices so the sum of squares keeps its precision
+    centre = prices[valid].mean() if valid.any() else 0.0
+    d = np.where(valid, prices - centre, 0.0)
+
+    # Trailing-window sums of the valid flags, the values and their squares,
+    # all read off one cumulative sum; the first window - 1 entries are NaN
+    csum = np.zeros((3, len(prices) + 1))
+    np.cumsum(np.stack((valid.astype(np.float64), d, d * d)), axis=1, out=csum[:, 1:])
+    sums = np.full((3, len(prices)), np.nan)
+    sums[:, window - 1:] = csum[:, window:] - csum[:, :-window]
+    count, s1, s2 = sums
+    full = count == window
+
+    mean = np.where(full, s1 / window + centre, np.nan)
+    if window > 1:
+        var = np.maximum(s2 - s1 * s1 / window, 0.0) / (window - 1)
+        std = np.where(full, np.sqrt(var), np.nan)
+    else:
+        std = np.full(len(prices), np.nan)
+    return mean, std
+
+
 def compute_moving_average(df: pd.DataFrame, window: int = 10) -> pd.DataFrame:
     """
     Compute a rolling moving average.
@@ -14,7 +46,8 @@ def compute_moving_average(df: pd.DataFrame, window: int = 10) -> pd.DataFrame:
         DataFrame with new column 'moving_avg'.
     """
     result = df.copy()
-    result["moving_avg"] = result["price"].rolling(window=window).mean()
+    prices = result["price"].to_numpy(dtype=float)
+    result["moving_avg"], _ = _rolling_mean_std(prices, window)
     return result
 
 
@@ -30,21 +63,73 @@ def detect_price_anomalies(
         threshold: Number of standard deviations to flag anomaly.
 
     Returns:
-        DataFrame with 'anomaly' boolean column.
+        DataFrame with 'moving_avg' and 'anomaly' boolean columns.
     """
     result = df.copy()
-    ma = result["price"].rolling(window=window).mean()
-    std = result["price"].rolling(window=window).std()
-    result["anomaly"] = (result["price"] - ma).abs() > threshold * std
+    prices = result["price"].to_numpy(dtype=float)
+    ma, std = _rolling_mean_std(prices, window)
+    result["moving_avg"] = ma
+    result["anomaly"] = np.abs(prices - ma) > threshold * std
     return result
 
 
+def _query_time_series(query: str) -> pd.DataFrame:
+    """
+    Run a query returning a 'timestamp' column and load the result via Arrow,
+    so the columns are converted to pandas in bulk rather than built from
+    Python row tuples.
+    """
+    table = client.query_arrow(query)
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    # ClickHouse sends DateTime over Arrow as seconds since the epoch
+    if not pd.api.types.is_datetime64_any_dtype(df["timestamp"]):
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")
+    return df
+
+
 def fetch_time_series_from_db():
     """
     Fetches timestamp/price pairs from ClickHouse and returns a pandas DataFrame.
     """
-    query = "SELECT timestamp, price FROM bitcoin_db.price_data ORDER BY timestamp"
-    data = client.query_df(query)
-    df = pd.DataFrame(data, columns=["timestamp", "price"])
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    # FINAL collapses duplicate timestamps not yet merged away by ReplacingMergeTree
+    query = "SELECT timestamp, price FROM bitcoin_db.price_data FINAL ORDER BY timestamp"
+    return _query_time_series(query)
+
+
+def fetch_analytics_from_db(window: int = 10, threshold: float = 2.0) -> pd.DataFrame:
+    """
+    Compute the moving average and anomaly flags in ClickHouse with window
+    functions and return them with the prices.
+
+    Same results as compute_moving_average + detect_price_anomalies: the first
+    window - 1 rows have no moving average and are never anomalies.
+
+    Args:
+        window: Number of rows in the rolling window.
+        threshold: Number of standard deviations to flag anomaly.
+
+    Returns:
+        DataFrame with columns ['timestamp', 'price', 'moving_avg', 'anomaly'].
+    """
+    window, threshold = int(window), float(threshold)
+    query = f"""
+        SELECT
+            timestamp,
+            price,
+            if(n = {window}, ma, NULL) AS moving_avg,
+            n = {window} AND abs(price - ma) > {threshold} * sd AS anomaly
+        FROM (
+            SELECT
+                timestamp,
+                price,
+                avg(price) OVER w AS ma,
+                stddevSamp(price) OVER w AS sd,
+                count() OVER w AS n
+            FROM bitcoin_db.price_data FINAL
+            WINDOW w AS (ORDER BY timestamp ROWS BETWEEN {window - 1} PRECEDING AND CURRENT ROW)
+        )
+        ORDER BY timestamp
+    """
+    df = _query_time_series(query)
+    df["anomaly"] = df["anomaly"].astype(bool)
     return df
@@ -17,4 +17,6 @@ client = get_client(
     password=CLIENT_PASS,
     database=CLIENT_DATABASE,
     interface="http",
+    # no shared session, so queries can run concurrently from several threads
+    autogenerate_session_id=False,
 )
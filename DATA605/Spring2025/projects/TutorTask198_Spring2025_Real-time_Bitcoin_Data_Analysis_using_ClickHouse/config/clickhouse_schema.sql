@@ -1,10 +1,11 @@
 -- 1) Create the database if it doesn’t already exist
 CREATE DATABASE IF NOT EXISTS bitcoin_db;
 
--- 2) Create the table, with no TTL
+-- 2) Create the table, with no TTL; rows with the same timestamp are
+--    collapsed by ReplacingMergeTree, so inserts need no prior dedup check
 CREATE TABLE IF NOT EXISTS bitcoin_db.price_data (
     timestamp DateTime,
     price     Float64
 )
-ENGINE = MergeTree()
+ENGINE = ReplacingMergeTree()
 ORDER BY timestamp;
@@ -2,30 +2,47 @@ import time
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
-
-
-def fetch_current_price(retries: int = 3, backoff: int = 10) -> float:
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout in seconds for CoinGecko requests
+TIMEOUT = (3.05, 10)
+
+# Connection pool shared by both sessions below. Rate limiting (429) and
+# transient server errors are retried with backoff.
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    ),
+)
+
+# Shared session so repeated polls reuse the same CoinGecko connection.
+_SESSION = requests.Session()
+_SESSION.mount("https://", _ADAPTER)
+
+# Historical prices do not change, so those responses are cached locally for
+# an hour; re-running a backfill then makes no CoinGecko requests.
+_CACHED_SESSION = CachedSession(
+    "btc_cache", backend="sqlite", expire_after=3600, allowable_codes=(200,)
+)
+_CACHED_SESSION.mount("https://", _ADAPTER)
+
+
+def fetch_current_price() -> float:
     """
-    Fetch the latest Bitcoin price in USD, with simple retry/backoff on 429.
+    Fetch the latest Bitcoin price in USD, with retry/backoff on 429.
     """
     url = "https://api.coingecko.com/api/v3/simple/price"
     params = {"ids": "bitcoin", "vs_currencies": "usd", "precision": "full"}
 
-    for attempt in range(1, retries + 1):
-        resp = requests.get(url, params=params)
-        if resp.status_code == 200:
-            return resp.json()["bitcoin"]["usd"]
-        elif resp.status_code == 429:
-            # Too many requests → wait and retry
-            wait = backoff * attempt
-            print(f"429 received, sleeping {wait}s before retry {attempt}/{retries}…")
-            time.sleep(wait)
-        else:
-            # some other error
-            resp.raise_for_status()
-
-    # If we get here, we never got a valid price
-    raise RuntimeError("Could not fetch current price after retries")
+    resp = _SESSION.get(url, params=params, timeout=TIMEOUT)
+    resp.raise_for_status()
+    return resp.json()["bitcoin"]["usd"]
 
 
 def fetch_historical_prices(days: int = 365, interval: str = "hourly") -> pd.DataFrame:
@@ -40,7 +57,7 @@ def fetch_historical_prices(days: int = 365, interval: str = "hourly") -> pd.Dat
     """
     url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart"
     params = {"vs_currency": "usd", "days": days, "interval": interval}
-    resp = requests.get(url, params=params)
+    resp = _CACHED_SESSION.get(url, params=params, timeout=TIMEOUT)
     resp.raise_for_status()
     entries = resp.json().get("prices", [])
     df = pd.DataFrame(entries, columns=["timestamp", "price"])
@@ -51,15 +68,15 @@ def fetch_historical_prices(days: int = 365, interval: str = "hourly") -> pd.Dat
 
 def fetch_historical_hourly_prices(
     days: int = 365,
-    retries: int = 3,
-    backoff_base: int = 5,
     throttle_seconds: float = 1.0,
 ) -> pd.DataFrame:
     """
     Fetch up to `days` of historical Bitcoin prices at true hourly granularity,
     by querying /market_chart/range in 90-day chunks, with retry/backoff on 429s.
     """
-    end = datetime.utcnow()
+    # align to the hour so re-runs within the hour request the same chunks
+    # and are served from the cache
+    end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
     start = end - timedelta(days=days)
     chunk = timedelta(days=90)
     dfs = []
@@ -73,21 +90,9 @@ def fetch_historical_hourly_prices(
             "to": int(chunk_end.timestamp()),
         }
 
-        # retry loop for this chunk
-        for attempt in range(1, retries + 1):
-            resp = requests.get(url, params=params)
-            if resp.status_code == 200:
-                break
-            elif resp.status_code == 429:
-                wait = backoff_base * attempt
-                print(f"[429] waiting {wait}s before retry {attempt}/{retries}…")
-                time.sleep(wait)
-            else:
-                resp.raise_for_status()
-        else:
-            raise RuntimeError(
-                f"Failed to fetch chunk {start} → {chunk_end} after {retries} retries"
-            )
+        # 429s are retried by the session
+        resp = _CACHED_SESSION.get(url, params=params, timeout=TIMEOUT)
+        resp.raise_for_status()
 
         # parse successful response
         prices = resp.json().get("prices", [])
@@ -96,8 +101,9 @@ def fetch_historical_hourly_prices(
         df_chunk["price"] = df_chunk["price"].astype(float)
         dfs.append(df_chunk)
 
-        # throttle before next chunk
-        time.sleep(throttle_seconds)
+        # throttle before next chunk, unless this one came from the cache
+        if not resp.from_cache:
+            time.sleep(throttle_seconds)
         start = chunk_end
 
     # concatenate, dedupe, and index
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 from config.clickhouse_client import client
 from ingest.fetch_prices import (
@@ -6,13 +7,14 @@ from ingest.fetch_prices import (
     fetch_historical_hourly_prices,
 )
 import pandas as pd
-import time
+import pyarrow as pa
 
 
 def ingest_historical_prices(days: int = 365, truncate: bool = False) -> None:
     """
-    Insert historical Bitcoin prices into ClickHouse, but only for timestamps
-    not already present.
+    Insert historical Bitcoin prices into ClickHouse. Timestamps already
+    present are collapsed by the table's ReplacingMergeTree engine, so no
+    existing rows are read back to filter them out.
 
     Args:
         days: Days of history to fetch.
@@ -24,63 +26,54 @@ def ingest_historical_prices(days: int = 365, truncate: bool = False) -> None:
     # fetch hourly points
     df = fetch_historical_hourly_prices(days)
 
-    # build a list of (datetime, float) tuples
-    cleaned = []
-    for ts, price in zip(df["timestamp"], df["price"]):
-        if ts is None or pd.isna(ts):
-            continue
-        if hasattr(ts, "to_pydatetime"):
-            ts = ts.to_pydatetime()
-        elif isinstance(ts, (int, float)):
-            ts = datetime.utcfromtimestamp(int(ts))
-        cleaned.append((ts, float(price)))
-
-    if not truncate and cleaned:
-        # determine range to query for existing data
-        min_ts = min(ts for ts, _ in cleaned)
-        max_ts = max(ts for ts, _ in cleaned)
-        # pull existing timestamps in that window
-        existing_ts_rows = client.execute(
-            """
-            SELECT timestamp
-              FROM bitcoin_db.price_data
-             WHERE timestamp >= %(min_ts)s
-               AND timestamp <= %(max_ts)s
-            """,
-            {"min_ts": min_ts, "max_ts": max_ts},
-        )
-        existing_ts = {row[0] for row in existing_ts_rows}
-
-        # filter out any that are already in the table
-        cleaned = [(ts, price) for ts, price in cleaned if ts not in existing_ts]
-
-    if cleaned:
-        client.insert("bitcoin_db.price_data", cleaned)
-    else:
-        print("📝 No new historical rows to insert.")
+    # send the columns as one Arrow table
+    if df.empty:
+        print("📝 No historical rows to insert.")
+        return
+
+    table = pa.Table.from_pandas(
+        df[["timestamp", "price"]].astype({"price": float}), preserve_index=False
+    )
+    client.insert_arrow("bitcoin_db.price_data", table)
 
 
 def ingest_current_price() -> None:
     """
-    Insert the current Bitcoin price into ClickHouse, unless that exact
-    timestamp is already present.
+    Insert the current Bitcoin price into ClickHouse. A row whose timestamp
+    is already present is collapsed by ReplacingMergeTree, so no existence
+    check is needed before the insert.
     """
     price = fetch_current_price()
     timestamp = datetime.utcnow()
 
-    # check for an existing row with this timestamp
-    count = client.query(
-        "SELECT count() FROM bitcoin_db.price_data WHERE timestamp = %(ts)s",
-        {"ts": timestamp},
-    )[0][0]
+    client.insert(
+        "bitcoin_db.price_data",
+        [(timestamp, price)],
+        column_names=["timestamp", "price"],
+    )
+
+
+async def auto_ingest(interval_sec: int = 60) -> None:
+    """
+    Ingest the current price every `interval_sec` on the running event loop.
+
+    The ClickHouse and CoinGecko clients are blocking, so each ingest runs in
+    a worker thread while the loop stays free for other scheduled tasks.
 
-    if count == 0:
-        client.command(
-            "INSERT INTO bitcoin_db.price_data (timestamp, price) VALUES (%(ts)s, %(price)s)",
-            {"ts": timestamp, "price": price},
-        )
-    else:
-        print(f"🗓️  Row for {timestamp!r} already exists; skipping insert.")
+    Args:
+        interval_sec: Seconds between fetches.
+    """
+    loop = asyncio.get_running_loop()
+    next_run = loop.time()
+    while True:
+        try:
+            await asyncio.to_thread(ingest_current_price)
+        except Exception as e:
+            # a transient CoinGecko or ClickHouse error skips only this tick
+            print(f"⚠️  Warning: price ingest failed ({e!r}), retrying next tick…")
+        # ticks are fixed, so a slow ingest does not push back later ones
+        next_run += interval_sec
+        await asyncio.sleep(max(0.0, next_run - loop.time()))
 
 
 def run_auto_ingest(interval_sec: int = 60) -> None:
@@ -92,8 +85,6 @@ def run_auto_ingest(interval_sec: int = 60) -> None:
     """
     print(f"⏳ Auto-ingesting every {interval_sec}s. Ctrl+C to stop.")
     try:
-        while True:
-            ingest_current_price()
-            time.sleep(interval_sec)
+        asyncio.run(auto_ingest(interval_sec))
     except KeyboardInterrupt:
         print("🛑 Auto-ingest stopped.")
@@ -1,12 +1,12 @@
 # main.py
+import asyncio
 import threading
-import time
 
 from flask import Flask, send_from_directory, abort, jsonify
 
 from pipeline.schema_setup import setup_schema
-from ingest.price_ingest import ingest_historical_prices, run_auto_ingest
-from analysis.time_series_analysis import fetch_time_series_from_db
+from ingest.price_ingest import auto_ingest, ingest_historical_prices
+from analysis.time_series_analysis import fetch_analytics_from_db
 from visualization.price_dashboard import plot_dashboard
 from visualization.system_dashboards import (
     build_dynamic_dashboard,
@@ -44,17 +44,43 @@ def serve_named_dashboard(name):
     return fig.to_html(full_html=True)
 
 
-def dashboard_updater(interval_sec: int = 60):
+def render_dashboard() -> None:
     """
-    Every `interval_sec` seconds:
-      - pull fresh time series from ClickHouse
-      - re-render the Plotly dashboard to dashboard.html
+    Pull fresh time series and analytics from ClickHouse and re-render the
+    Plotly dashboard to dashboard.html.
     """
+    df = fetch_analytics_from_db()
+    fig = plot_dashboard(df)
+    fig.write_html("dashboard.html", auto_open=False)
+
+
+async def dashboard_updater(interval_sec: int = 60):
+    """
+    Re-render the dashboard every `interval_sec` seconds on the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    next_run = loop.time()
     while True:
-        df = fetch_time_series_from_db()
-        fig = plot_dashboard(df)
-        fig.write_html("dashboard.html", auto_open=False)
-        time.sleep(interval_sec)
+        try:
+            await asyncio.to_thread(render_dashboard)
+        except Exception as e:
+            # a transient ClickHouse error skips only this rebuild
+            print(f"⚠️  Warning: dashboard rebuild failed ({e!r}), retrying next tick…")
+        next_run += interval_sec
+        await asyncio.sleep(max(0.0, next_run - loop.time()))
+
+
+async def background_tasks(interval_sec: int = 60):
+    """
+    Run price ingestion and dashboard rebuilds as tasks on one event loop.
+    Each loop reports and survives its own per-tick errors; an unexpected
+    exit of one task does not stop the other.
+    """
+    await asyncio.gather(
+        auto_ingest(interval_sec),
+        dashboard_updater(interval_sec),
+        return_exceptions=True,
+    )
 
 
 if __name__ == "__main__":
@@ -70,20 +96,14 @@ if __name__ == "__main__":
         )
 
     # 3) Build the initial dashboard
-    df0 = fetch_time_series_from_db()
-    fig0 = plot_dashboard(df0)
-    fig0.write_html("dashboard.html", auto_open=False)
-
-    # 4) Start the ingestion thread (runs every 60 s)
-    threading.Thread(
-        target=run_auto_ingest, kwargs={"interval_sec": 60}, daemon=True
-    ).start()
+    render_dashboard()
 
-    # 5) Start the dashboard‐rebuild thread (runs every 60 s)
+    # 4) Start ingestion and dashboard rebuilds (every 60 s) on one
+    #    event loop, in a single background thread beside Flask
     threading.Thread(
-        target=dashboard_updater, kwargs={"interval_sec": 60}, daemon=True
+        target=asyncio.run, args=(background_tasks(60),), daemon=True
     ).start()
 
-    # 6) Launch the Flask server (this pushes the proper application context)
+    # 5) Launch the Flask server (this pushes the proper application context)
     # turn on debug + reloader so the server restarts whenever you edit code
     app.run(host="0.0.0.0", port=5001, debug=True, use_reloader=True)
@@ -33,16 +33,18 @@ def plot_moving_average(df, window=10):
 
 def plot_anomalies(df, window=10, threshold=2.0):
     df_anom = detect_price_anomalies(df, window, threshold)
+    timestamps = df_anom["timestamp"].to_numpy()
+    prices = df_anom["price"].to_numpy()
+    anomaly = df_anom["anomaly"].to_numpy()
     fig = go.Figure()
+    # WebGL traces keep long series responsive in the browser
+    fig.add_trace(go.Scattergl(x=timestamps, y=prices, mode="lines", name="Price"))
+    # only the flagged points are sent for the marker trace; padding it to
+    # the full series with NaN would serialize a null for every other point
     fig.add_trace(
-        go.Scatter(
-            x=df_anom["timestamp"], y=df_anom["price"], mode="lines", name="Price"
-        )
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=df_anom.loc[df_anom["anomaly"], "timestamp"],
-            y=df_anom.loc[df_anom["anomaly"], "price"],
+        go.Scattergl(
+            x=timestamps[anomaly],
+            y=prices[anomaly],
             mode="markers",
             name="Anomalies",
             marker=dict(size=8),
@@ -62,28 +64,53 @@ def plot_dashboard(df, window=10, threshold=2.0):
     Build a 3-panel dashboard: price, moving average, anomalies.
 
     Args:
-        df: DataFrame with analytics columns.
+        df: DataFrame with ['timestamp', 'price'] and optionally the
+            'moving_avg' and 'anomaly' columns.
         window: Rolling window used.
         threshold: Anomaly threshold.
 
     Returns:
         Plotly Figure ready to write_html().
     """
-    fig1 = plot_price(df)
-    fig2 = plot_moving_average(df, window)
-    fig3 = plot_anomalies(df, window, threshold)
+    # one pass computes both the moving average and the anomaly flags, unless
+    # they were already computed (e.g. by fetch_analytics_from_db)
+    if {"moving_avg", "anomaly"}.issubset(df.columns):
+        df_anom = df
+    else:
+        df_anom = detect_price_anomalies(df, window, threshold)
+    timestamps = df_anom["timestamp"].to_numpy()
+    prices = df_anom["price"].to_numpy()
+    anomaly = df_anom["anomaly"].to_numpy()
+
     dash = make_subplots(
         rows=3,
         cols=1,
         subplot_titles=["Price", "Moving Average", "Anomalies"],
         vertical_spacing=0.1,
     )
-    for t in fig1.data:
-        dash.add_trace(t, row=1, col=1)
-    for t in fig2.data:
-        dash.add_trace(t, row=2, col=1)
-    for t in fig3.data:
-        dash.add_trace(t, row=3, col=1)
+    # WebGL traces keep long series responsive in the browser
+    dash.add_trace(
+        go.Scattergl(x=timestamps, y=prices, mode="lines", name="Price"),
+        row=1, col=1,
+    )
+    dash.add_trace(
+        go.Scattergl(
+            x=timestamps, y=df_anom["moving_avg"].to_numpy(), mode="lines",
+            name=f"{window}-Day Moving Average",
+        ),
+        row=2, col=1,
+    )
+    dash.add_trace(
+        go.Scattergl(x=timestamps, y=prices, mode="lines", name="Price"),
+        row=3, col=1,
+    )
+    dash.add_trace(
+        go.Scattergl(
+            x=timestamps[anomaly], y=prices[anomaly], mode="markers",
+            name="Anomalies", marker=dict(size=8),
+        ),
+        row=3, col=1,
+    )
     dash.update_layout(
         height=1200,
         title_text="Bitcoin Price Dashboard",
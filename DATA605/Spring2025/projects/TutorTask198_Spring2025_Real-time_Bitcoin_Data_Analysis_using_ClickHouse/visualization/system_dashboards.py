@@ -1,10 +1,23 @@
 # visualization/system_dashboards.py
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+
 import pandas as pd
+from clickhouse_connect.driver.exceptions import DatabaseError
 from config.clickhouse_client import client
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+# Charts are fetched in hour-long chunks aligned to the hour, so every chunk
+# except the trailing one is an identical query on each render and can be
+# answered from the ClickHouse query cache.
+CHUNK_SECONDS = 3600
+DASHBOARD_HOURS = 24
+ROUNDING_SECONDS = 60
+MAX_CHUNK_WORKERS = 8
+
 
 def fetch_dashboard_specs():
     """
@@ -15,12 +28,106 @@ def fetch_dashboard_specs():
       FROM system.dashboards
       ORDER BY dashboard, title
     """
-    return client.command(sql)
+    return client.query(sql).result_rows
+
+
+def _chunk_bounds(hours: int = DASHBOARD_HOURS, now: float = None):
+    """
+    Return (start, end, closed) epoch-second ranges covering the last `hours`
+    hours plus the current partial hour, aligned to hour boundaries.
+    """
+    now = time.time() if now is None else now
+    current = int(now) // CHUNK_SECONDS * CHUNK_SECONDS
+    bounds = [
+        (start, start + CHUNK_SECONDS, True)
+        for start in range(current - hours * CHUNK_SECONDS, current, CHUNK_SECONDS)
+    ]
+    bounds.append((current, current + CHUNK_SECONDS, False))
+    return bounds
+
+
+def _pin_now(query: str) -> str:
+    """
+    system.dashboards queries look back {seconds:UInt32} from now(); pin now()
+    to the chunk end so the query text is stable for closed chunks.
+    """
+    return query.replace("now()", "toDateTime({chunk_end:UInt32})")
+
+
+def _fetch_chunk(queries, start: int, end: int, closed: bool) -> pd.DataFrame:
+    """
+    Run the (panel, query) pairs for the [start, end) chunk as a single
+    UNION ALL query, returning columns ['panel', 't', 'v'].
+
+    The rows arrive as an Arrow table, so the columns are converted to pandas
+    in bulk rather than built from Python row tuples.
+    """
+    union = " UNION ALL ".join(
+        f"SELECT {panel} AS panel, * FROM ({_pin_now(query)})"
+        for panel, query in queries
+    )
+    chunk_query = (
+        f"SELECT * FROM ({union}) "
+        "WHERE t >= {chunk_start:UInt32} AND t < {chunk_end:UInt32}"
+    )
+    settings = {"use_query_cache": int(closed)}
+    if closed:
+        # keep a finished chunk cached for as long as it stays on the dashboard
+        settings["query_cache_ttl"] = DASHBOARD_HOURS * CHUNK_SECONDS
+        # panels read system tables, which the cache refuses by default; a
+        # closed chunk's result is fixed once now() is pinned, so cache it
+        settings["query_cache_system_table_handling"] = "save"
+    table = client.query_arrow(
+        chunk_query,
+        parameters={
+            "rounding": ROUNDING_SECONDS,
+            "seconds": end - start,
+            "chunk_start": start,
+            "chunk_end": end,
+        },
+        settings=settings,
+        use_strings=True,
+    )
+    # assume each query returns two columns: x,timestamp-like, and y,value-like
+    table = table.rename_columns(["panel", "t", "v"])
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _is_no_common_type(error: DatabaseError) -> bool:
+    """
+    True if the server rejected the UNION ALL with NO_COMMON_TYPE (code 386).
+    """
+    message = str(error)
+    return "NO_COMMON_TYPE" in message or "Code: 386." in message
+
+
+def _fetch_panels(queries, executor: ThreadPoolExecutor) -> pd.DataFrame:
+    """
+    Fetch all chunks of every panel concurrently and stitch them back together.
+    """
+    bounds = _chunk_bounds()
+    try:
+        chunks = list(executor.map(lambda b: _fetch_chunk(queries, *b), bounds))
+    except DatabaseError as e:
+        # panels whose value columns have no common type can't be unioned,
+        # so query them one at a time instead; any other error is re-raised
+        if not _is_no_common_type(e):
+            raise
+        chunks = list(
+            executor.map(
+                lambda args: _fetch_chunk([args[0]], *args[1]),
+                product(queries, bounds),
+            )
+        )
+    df = pd.concat(chunks, ignore_index=True)
+    # a row falling on a chunk boundary is kept once, from the later chunk
+    return df.drop_duplicates(["panel", "t"], keep="last").sort_values(["panel", "t"])
 
 
 def build_dynamic_dashboard(name: str):
     """
-    Given a dashboard name, runs each spec’s query and packs them into a vertical subplot.
+    Given a dashboard name, runs the specs' queries together and packs them
+    into a vertical subplot.
     """
     specs = [spec for spec in fetch_dashboard_specs() if spec[0] == name]
     if not specs:
@@ -32,12 +139,15 @@ def build_dynamic_dashboard(name: str):
         subplot_titles=[title for _, title, _ in specs],
         vertical_spacing=0.08,
     )
-    for i, (_, title, query) in enumerate(specs, start=1):
-        data = client.command(query)
-        # assume each query returns two columns: x,timestamp-like, and y,value-like
-        df = pd.DataFrame(data, columns=["t", "v"])
+    with ThreadPoolExecutor(max_workers=MAX_CHUNK_WORKERS) as executor:
+        df = _fetch_panels([(i, query) for i, (_, _, query) in enumerate(specs)], executor)
+    panels = dict(tuple(df.groupby("panel")))
+    for i, (_, title, _) in enumerate(specs):
+        panel = panels.get(i, df.iloc[:0])
         fig.add_trace(
-            go.Scatter(x=df["t"], y=df["v"], mode="lines", name=title), row=i, col=1
+            go.Scatter(x=panel["t"], y=panel["v"], mode="lines", name=title),
+            row=i + 1,
+            col=1,
         )
     fig.update_layout(height=300 * n, title_text=f"Dashboard: {name}")
     return fig
@@ -1,12 +1,17 @@
+import numpy as np
 import pandas as pd
 import cloudpickle
+from numba import njit
 import os
 import logging
+import time
 import requests
-import matplotlib.pyplot as plt
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import plotly.graph_objects as go
 from datetime import datetime
 from ipywidgets import widgets
-from IPython.display import display, clear_output
+from IPython.display import display
 
 # -----------------------------------------------------------------------------
 # Logging Setup
@@ -14,6 +19,103 @@ from IPython.display import display, clear_output
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# -----------------------------------------------------------------------------
+# HTTP Session and Response Cache
+# -----------------------------------------------------------------------------
+# The 24-hour chart behind the dashboard is reused for CHART_CACHE_TTL seconds
+# and then revalidated, so unchanged data costs a 304 instead of a download.
+CHART_CACHE_TTL = 60
+# The dashboard fetches on a button click, so retries of rate limits and
+# gateway errors are kept short rather than waiting out CoinGecko's
+# Retry-After; a failed refresh leaves the current prices on screen
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    backoff_max=4,
+    status_forcelist=(429, 502, 503, 504),
+    respect_retry_after_header=False,
+    # hand back the last error response so callers still see an HTTPError
+    raise_on_status=False,
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(max_retries=_RETRY, pool_connections=4, pool_maxsize=4))
+_cache = {}
+
+
+def _get_json(url, params=None, headers=None, ttl=0):
+    """
+    GET a JSON endpoint through the shared session, serving it from the cache
+    for `ttl` seconds and revalidating with ETag / Last-Modified once expired.
+    Raises requests.HTTPError for error responses.
+    """
+    key = (url, tuple(sorted((params or {}).items())))
+    cached = _cache.get(key)
+    if cached and time.monotonic() < cached["expires"]:
+        return cached["data"]
+    headers = dict(headers or {})
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached["last_modified"]:
+        headers["If-Modified-Since"] = cached["last_modified"]
+    res = _SESSION.get(url, params=params, headers=headers, timeout=10)
+    if cached and res.status_code == 304:
+        cached["expires"] = time.monotonic() + ttl
+        return cached["data"]
+    res.raise_for_status()
+    _cache[key] = {
+        "data": res.json(),
+        "etag": res.headers.get("ETag"),
+        "last_modified": res.headers.get("Last-Modified"),
+        "expires": time.monotonic() + ttl,
+    }
+    return _cache[key]["data"]
+
+# -----------------------------------------------------------------------------
+# Analysis Kernels
+# -----------------------------------------------------------------------------
+@njit(cache=True, fastmath=True)
+def _rolling_mean(prices, window):
+    n = prices.size
+    ma = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += prices[j]
+        ma[i] = total / window
+    return ma
+
+
+@njit(cache=True, fastmath=True)
+def _anomaly_mask(prices, threshold):
+    n = prices.size
+    mask = np.zeros(n, dtype=np.bool_)
+    # Like pandas, the sample std of fewer than two prices is undefined
+    if n < 2:
+        return mask
+    mean = prices.sum() / n
+    var = 0.0
+    for i in range(n):
+        var += (prices[i] - mean) ** 2
+    limit = threshold * np.sqrt(var / (n - 1))
+    for i in range(n):
+        mask[i] = abs(prices[i] - mean) > limit
+    return mask
+
+
+def moving_average(data, window=5):
+    """
+    Rolling mean of a price Series, NaN until the window is full.
+    """
+    ma = _rolling_mean(data.to_numpy(dtype=np.float64), window)
+    return pd.Series(ma, index=data.index, name=data.name)
+
+
+def detect_anomalies(data, threshold=2.0):
+    """
+    Prices more than `threshold` standard deviations away from the mean.
+    """
+    return data[_anomaly_mask(data.to_numpy(dtype=np.float64), threshold)]
+
 # -----------------------------------------------------------------------------
 # Utility Function 1: Serialize Analysis Functions
 # -----------------------------------------------------------------------------
@@ -21,14 +123,15 @@ def serialize_analysis_functions():
     """
     Serializes the analysis functions (moving average and anomaly detection)
     to disk to avoid recomputing them.
+
+    They are module-level functions, so cloudpickle stores them by reference
+    and loading them also picks up their compiled kernels.
     """
     if not os.path.exists("ma_func.pkl"):
-        ma_func = lambda data, window=5: data.rolling(window=window).mean()
-        anomaly_func = lambda data, threshold=2.0: data[(data - data.mean()).abs() > threshold * data.std()]
         with open("ma_func.pkl", "wb") as f:
-            cloudpickle.dump(ma_func, f)
+            cloudpickle.dump(moving_average, f)
         with open("anomaly_func.pkl", "wb") as f:
-            cloudpickle.dump(anomaly_func, f)
+            cloudpickle.dump(detect_anomalies, f)
 
 # -----------------------------------------------------------------------------
 # Utility Function 2: Load Analysis Functions
@@ -50,18 +153,18 @@ def load_analysis_functions():
 def fetch_bitcoin_data():
     """
     Fetches Bitcoin price data from the CoinGecko API for the last 24 hours.
+    Repeated calls within CHART_CACHE_TTL seconds reuse the previous response.
     Returns the data as a Pandas DataFrame.
     """
     url = 'https://api.coingecko.com/api/v3/coins/bitcoin/market_chart'
     params = {'vs_currency': 'usd', 'days': '1'}
     headers = {'User-Agent': 'Mozilla/5.0'}
-    res = requests.get(url, params=params, headers=headers)
-
-    if res.status_code != 200:
-        print(f"❌ Error: Status code {res.status_code}")
+    try:
+        data = _get_json(url, params=params, headers=headers, ttl=CHART_CACHE_TTL)
+    except requests.HTTPError as e:
+        print(f"❌ Error: Status code {e.response.status_code}")
         return None
 
-    data = res.json()
     if 'prices' not in data:
         print("❌ 'prices' key missing in response")
         return None
@@ -78,59 +181,79 @@ def interactive_dashboard(ma_window=5, threshold=2.0):
     """
     Creates an interactive dashboard with sliders to control the moving average window 
     and anomaly detection threshold, and updates the plot dynamically.
-    """
-    # Clear previous output
-    clear_output(wait=True)
-    
-    serialize_analysis_functions()
-    ma_func, anomaly_func = load_analysis_functions()
 
+    The plot is a single Plotly FigureWidget: moving a slider recomputes the
+    analysis and replaces only the moving average and anomaly traces in place,
+    and Refresh re-fetches the prices, so the cell is never redrawn.
+    """
     # Fetch Bitcoin data
     df = fetch_bitcoin_data()
     if df is None:
         print("⚠️ Failed to fetch data.")
         return
 
-    # Calculate Moving Average and Anomalies
-    ma = ma_func(df['price'], window=ma_window)
-    anomalies = anomaly_func(df['price'], threshold=threshold)
-
-    # --- Show Summary Stats ---
-    print(f"📊 Stats (Last 24h):")
-    print(f"• Latest Price: ${df['price'].iloc[-1]:,.2f}")
-    print(f"• Mean Price:   ${df['price'].mean():,.2f}")
-    print(f"• Std Dev:      ${df['price'].std():,.2f}")
-    print(f"• Anomalies Detected: {len(anomalies)}")
-    print()
-
-    # --- Plot the Dashboard ---
-    plt.figure(figsize=(12, 6))
-    plt.plot(df.index, df['price'], label="BTC Price", color='skyblue')
-    plt.plot(ma.index, ma, label=f"MA (window={ma_window})", color='orange')
-    plt.scatter(anomalies.index, anomalies, color='red', label="Anomalies", zorder=5)
-    plt.title(f"BTC/USD - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    plt.xlabel("Time")
-    plt.ylabel("Price (USD)")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
-
     # --- Interactive Widgets ---
     # Create sliders for MA window and anomaly threshold
     ma_slider = widgets.IntSlider(value=ma_window, min=2, max=20, step=1, description='MA Window')
     threshold_slider = widgets.FloatSlider(value=threshold, min=0.5, max=4.0, step=0.1, description='Anomaly Threshold')
     refresh_button = widgets.Button(description="🔄 Refresh")
 
-    # Output area for updating the plot
-    out = widgets.Output()
+    # Output area for the summary stats
+    stats = widgets.Output()
+
+    # --- Plot the Dashboard ---
+    fig = go.FigureWidget(
+        data=[
+            go.Scatter(mode="lines", name="BTC Price", line=dict(color='skyblue')),
+            go.Scatter(mode="lines", line=dict(color='orange')),
+            go.Scatter(mode="markers", name="Anomalies", marker=dict(color='red')),
+        ],
+        layout=dict(xaxis_title="Time", yaxis_title="Price (USD)", height=500),
+    )
+
+    def update_prices():
+        with fig.batch_update():
+            fig.data[0].x = df.index
+            fig.data[0].y = df['price'].to_numpy()
+            fig.layout.title = f"BTC/USD - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+
+    def update_analysis(change=None):
+        # Calculate Moving Average and Anomalies
+        ma = moving_average(df['price'], window=ma_slider.value)
+        anomalies = detect_anomalies(df['price'], threshold=threshold_slider.value)
+        with fig.batch_update():
+            fig.data[1].x = ma.index
+            fig.data[1].y = ma.to_numpy()
+            fig.data[1].name = f"MA (window={ma_slider.value})"
+            fig.data[2].x = anomalies.index
+            fig.data[2].y = anomalies.to_numpy()
+
+        # --- Show Summary Stats ---
+        with stats:
+            stats.clear_output(wait=True)
+            print(f"📊 Stats (Last 24h):")
+            print(f"• Latest Price: ${df['price'].iloc[-1]:,.2f}")
+            print(f"• Mean Price:   ${df['price'].mean():,.2f}")
+            print(f"• Std Dev:      ${df['price'].std():,.2f}")
+            print(f"• Anomalies Detected: {len(anomalies)}")
 
     def on_refresh_clicked(b):
-        with out:
-            interactive_dashboard(ma_slider.value, threshold_slider.value)
+        nonlocal df
+        latest = fetch_bitcoin_data()
+        if latest is None:
+            with stats:
+                print("⚠️ Failed to fetch data.")
+            return
+        df = latest
+        update_prices()
+        update_analysis()
 
+    update_prices()
+    update_analysis()
+    ma_slider.observe(update_analysis, names='value')
+    threshold_slider.observe(update_analysis, names='value')
     refresh_button.on_click(on_refresh_clicked)
 
-    # Display widgets and output area
+    # Display widgets, stats and the figure
     ui = widgets.VBox([ma_slider, threshold_slider, refresh_button])
-    display(ui, out)
\ No newline at end of file
+    display(ui, stats, fig)
@@ -0,0 +1,75 @@
+import os, json
+import boto3
+from botocore.config import Config
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+RAW_BUCKET = os.environ['RAW_BUCKET']
+FETCH_WORKERS = 64
+# One JSON-lines object per hour of samples, e.g. raw/2025/05/01/13.jsonl
+HOURLY_KEY_FORMAT = 'raw/%Y/%m/%d/%H.jsonl'
+s3 = boto3.client('s3', config=Config(max_pool_connections=FETCH_WORKERS))
+
+def hourly_key(hour):
+    return hour.strftime(HOURLY_KEY_FORMAT)
+
+def list_sample_keys():
+    """Yield (key, timestamp) of the per-sample objects (ISO timestamp keys at the bucket root)"""
+    paginator = s3.get_paginator('list_objects_v2')
+    # the delimiter keeps the compacted raw/ objects out of the listing
+    for page in paginator.paginate(Bucket=RAW_BUCKET, Delimiter='/'):
+        for o in page.get('Contents', []):
+            yield o['Key'], datetime.fromisoformat(o['Key'].split('.')[0])
+
+def read_hour(hour):
+    """{ds: price} of an hour already compacted by an earlier run, or {} if there is none"""
+    try:
+        body = s3.get_object(Bucket=RAW_BUCKET, Key=hourly_key(hour))['Body'].read()
+    except s3.exceptions.NoSuchKey:
+        return {}
+    records = (json.loads(line) for line in body.decode().splitlines() if line)
+    return {r['ds']: r['price'] for r in records}
+
+def compact_hour(hour, samples, pool):
+    """Merge one hour's samples into its hourly object; return the number of samples left undeleted"""
+    def fetch(key):
+        return json.loads(s3.get_object(Bucket=RAW_BUCKET, Key=key)['Body'].read())['price']
+    existing = pool.submit(read_hour, hour)
+    prices = list(pool.map(fetch, [key for _, key in samples]))
+
+    # samples keep their ISO timestamp, so ones merged by an earlier, partly
+    # failed run replace their old copy instead of being counted twice
+    merged = existing.result()
+    merged.update((ts.isoformat(), price) for (ts, _), price in zip(samples, prices))
+    body = '\n'.join(json.dumps({'ds': ds, 'price': merged[ds]}) for ds in sorted(merged))
+    s3.put_object(Bucket=RAW_BUCKET, Key=hourly_key(hour), Body=body,
+                  ContentType='application/x-ndjson')
+
+    # drop the merged samples, 1000 keys per request; any that fail to delete
+    # are merged again, idempotently, by the next run
+    keys = [key for _, key in samples]
+    failed = 0
+    for i in range(0, len(keys), 1000):
+        resp = s3.delete_objects(Bucket=RAW_BUCKET,
+                                 Delete={'Objects': [{'Key': k} for k in keys[i:i + 1000]]})
+        for err in resp.get('Errors', []):
+            print(f"Failed to delete {err['Key']}: {err.get('Code')} {err.get('Message')}")
+        failed += len(resp.get('Errors', []))
+    return failed
+
+def handler(event, context):
+    """Merge the per-sample objects of every complete hour into one JSON-lines object per hour"""
+    current_hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    # every hour before the current one, so hours missed by earlier runs are caught up
+    by_hour = defaultdict(list)
+    for key, ts in list_sample_keys():
+        if ts < current_hour:
+            by_hour[ts.replace(minute=0, second=0, microsecond=0)].append((ts, key))
+
+    compacted = failed = 0
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        for hour, samples in sorted(by_hour.items()):
+            samples.sort()
+            failed += compact_hour(hour, samples, pool)
+            compacted += len(samples)
+    return {'compacted': compacted, 'hours': len(by_hour), 'undeleted': failed}
@@ -1,31 +1,76 @@
-import os, io, json, pickle
-import boto3, pandas as pd
-from prophet import Prophet
-from datetime import datetime, timedelta
+import os, io, json
+import boto3, joblib, pandas as pd
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from statsforecast import StatsForecast
+from statsforecast.models import AutoARIMA
+from compact import hourly_key
+from datetime import datetime, timedelta, timezone
 import numpy as np
 RAW_BUCKET   = os.environ['RAW_BUCKET']
 MODEL_BUCKET = os.environ['MODEL_BUCKET']
-s3 = boto3.client('s3')
+# joblib pickle, LZ4-compressed; load with joblib.load on the downloaded body
+MODEL_KEY    = 'model.pkl.lz4'
+FETCH_WORKERS = 64   # concurrent S3 GETs when gathering raw data
+SAMPLE_FREQ  = 'min' # grid the samples are aligned to before fitting
+s3 = boto3.client('s3', config=Config(max_pool_connections=FETCH_WORKERS))
+# large model artifacts go up as concurrent multipart uploads
+UPLOAD_CONFIG = TransferConfig(multipart_threshold=8 * 1024 * 1024,
+                               max_concurrency=8, use_threads=True)
+
+def list_recent_objects(cutoff):
+    """Yield (key, timestamp) of per-sample objects newer than cutoff, over all list pages"""
+    paginator = s3.get_paginator('list_objects_v2')
+    # the delimiter keeps the hourly raw/ objects out of the listing
+    for page in paginator.paginate(Bucket=RAW_BUCKET, Delimiter='/'):
+        for o in page.get('Contents', []):
+            # an object is written after its sample is taken, so older
+            # objects are skipped without parsing their key
+            if o['LastModified'] <= cutoff:
+                continue
+            ts = datetime.fromisoformat(o['Key'].split('.')[0])
+            if ts > cutoff.replace(tzinfo=None):
+                yield o['Key'], ts
+
+def fetch_price(key):
+    data = json.loads(s3.get_object(Bucket=RAW_BUCKET, Key=key)['Body'].read())
+    return data['price']
+
+def fetch_hour(key):
+    """Samples of one hourly JSON-lines object written by compact.py, or None if it does not exist"""
+    try:
+        body = s3.get_object(Bucket=RAW_BUCKET, Key=key)['Body'].read()
+    except s3.exceptions.NoSuchKey:
+        return None
+    return pd.read_json(io.BytesIO(body), lines=True, convert_dates=['ds'])
 
 def handler(event, context):
-    # 1) Gather last 7 days of raw data
-    cutoff = datetime.utcnow() - timedelta(days=7)
-    objs = s3.list_objects_v2(Bucket=RAW_BUCKET).get('Contents',[])
-    rows = []
-    for o in objs:
-        ts = datetime.fromisoformat(o['Key'].split('.')[0])
-        if ts > cutoff:
-            data = json.loads(s3.get_object(Bucket=RAW_BUCKET,Key=o['Key'])['Body'].read())
-            rows.append({'ds': ts, 'y': data['price']})
-    df = pd.DataFrame(rows)
-    # 2) Train Prophet
-    m = Prophet()
-    m.fit(df)
+    # 1) Gather last 7 days of raw data: one object per compacted hour, plus
+    #    the per-sample objects not compacted yet, all fetched concurrently
+    cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+    naive_cutoff = cutoff.replace(tzinfo=None)
+    first_hour = naive_cutoff.replace(minute=0, second=0, microsecond=0)
+    hours = pd.date_range(first_hour, datetime.utcnow(), freq='h')
+    recent = list(list_recent_objects(cutoff))
+    # sample times and prices go straight into typed arrays, in listing order
+    ds = np.array([ts for _, ts in recent], dtype='datetime64[us]')
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        hourly = pool.map(fetch_hour, [hourly_key(h) for h in hours])
+        y = np.fromiter(pool.map(fetch_price, [key for key, _ in recent]),
+                        dtype=np.float64, count=len(recent))
+    frames = [h.rename(columns={'price': 'y'}) for h in hourly if h is not None]
+    frames.append(pd.DataFrame({'ds': ds, 'y': y}))
+    df = pd.concat(frames, ignore_index=True)
+    df = df[df['ds'] > naive_cutoff]
+    # 2) Train AutoARIMA on a regular grid, filling gaps with the last price
+    series = df.set_index('ds')['y'].sort_index().resample(SAMPLE_FREQ).mean().ffill()
+    m = StatsForecast(models=[AutoARIMA(season_length=1)], freq=SAMPLE_FREQ)
+    m.fit(pd.DataFrame({'unique_id': 'btc', 'ds': series.index, 'y': series.to_numpy()}))
     buf = io.BytesIO()
-    pickle.dump(m, buf)
+    # the model's arrays compress well and LZ4 costs little time to decode
+    joblib.dump(m, buf, compress=('lz4', 3))
     buf.seek(0)
-    # 3) Upload model artifact
-    s3.put_object(Bucket=MODEL_BUCKET,
-                  Key='model.pkl',
-                  Body=buf.read())
+    # 3) Upload model artifact straight from the buffer, without copying it
+    s3.upload_fileobj(buf, MODEL_BUCKET, MODEL_KEY, Config=UPLOAD_CONFIG)
     
@@ -4,43 +4,125 @@ LightGBM_utils.py
 Reusable utility functions for real-time Bitcoin price forecasting using LightGBM.
 """
 
+import os
+import time
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import lightgbm as lgb
 import numpy as np
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
+import plotly.graph_objects as go
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 from sklearn.model_selection import train_test_split
 
-def fetch_bitcoin_data(days=200):
-    url = f"https://api.coingecko.com/api/v3/coins/bitcoin/market_chart?vs_currency=usd&days={days}"
-    response = requests.get(url)
+# The daily training history changes slowly: it is reused for HISTORY_CACHE_TTL
+# seconds, then revalidated with its ETag / Last-Modified so an unchanged
+# chart isn't downloaded and parsed again
+HISTORY_CACHE_TTL = 60
+# The history is fetched once before training, so rate limits and gateway
+# errors are retried with backoff (capped at 10 s between attempts),
+# honouring CoinGecko's Retry-After header
+_RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    backoff_max=10,
+    status_forcelist=(429, 502, 503, 504),
+    respect_retry_after_header=True,
+    # hand back the last error response so callers still see an HTTPError
+    raise_on_status=False,
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(max_retries=_RETRY, pool_connections=4, pool_maxsize=4))
+_cache = {}
+
+def _get_json(url, params=None, ttl=0):
+    """GET a JSON endpoint, reusing the response for `ttl` seconds before revalidating it."""
+    key = (url, tuple(sorted((params or {}).items())))
+    cached = _cache.get(key)
+    if cached and time.monotonic() < cached["expires"]:
+        return cached["data"]
+    headers = {}
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached["last_modified"]:
+        headers["If-Modified-Since"] = cached["last_modified"]
+    response = _SESSION.get(url, params=params, headers=headers, timeout=10)
+    if cached and response.status_code == 304:
+        cached["expires"] = time.monotonic() + ttl
+        return cached["data"]
     response.raise_for_status()
-    data = response.json()["prices"]
+    _cache[key] = {
+        "data": response.json(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "expires": time.monotonic() + ttl,
+    }
+    return _cache[key]["data"]
+
+def fetch_bitcoin_data(days=200):
+    url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart"
+    data = _get_json(url, params={"vs_currency": "usd", "days": days}, ttl=HISTORY_CACHE_TTL)["prices"]
     df = pd.DataFrame(data, columns=["timestamp", "price"])
     df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
     return df
 
 def create_features(df):
-    df = df.copy()
-    df["minute"] = df["timestamp"].dt.minute
-    df["hour"] = df["timestamp"].dt.hour
-    df["dayofweek"] = df["timestamp"].dt.dayofweek
-    df["lag_1"] = df["price"].shift(1)
-    df["lag_2"] = df["price"].shift(2)
-    df["rolling_mean_3"] = df["price"].rolling(3).mean()
-    df["rolling_std_3"] = df["price"].rolling(3).std()
-    df = df.dropna()
-    return df
+    # Work on the raw arrays once instead of through separate pandas accessors
+    seconds = df["timestamp"].to_numpy().astype("datetime64[s]").astype(np.int64)
+    price = df["price"].to_numpy(dtype=float)
+    # The first two rows have incomplete lags and windows and are dropped below
+    lag_1 = np.full_like(price, np.nan)
+    lag_1[1:] = price[:-1]
+    lag_2 = np.full_like(price, np.nan)
+    lag_2[2:] = price[:-2]
+    rolling_mean_3 = np.full_like(price, np.nan)
+    rolling_std_3 = np.full_like(price, np.nan)
+    # With fewer than 3 prices there is no full window and every row is dropped
+    if len(price) >= 3:
+        windows = np.lib.stride_tricks.sliding_window_view(price, 3)
+        rolling_mean_3[2:] = windows.mean(axis=1)
+        rolling_std_3[2:] = windows.std(axis=1, ddof=1)
+    features = pd.DataFrame({
+        "timestamp": df["timestamp"].to_numpy(),
+        "price": price,
+        "minute": seconds // 60 % 60,
+        "hour": seconds // 3600 % 24,
+        # 1970-01-01 was a Thursday, so shift by 3 to get Monday=0
+        "dayofweek": (seconds // 86400 + 3) % 7,
+        "lag_1": lag_1,
+        "lag_2": lag_2,
+        "rolling_mean_3": rolling_mean_3,
+        "rolling_std_3": rolling_std_3,
+    }, index=df.index)
+    return features.dropna()
 
 def train_lightgbm(df):
     features = ["minute", "hour", "dayofweek", "lag_1", "lag_2", "rolling_mean_3", "rolling_std_3"]
     X = df[features]
     y = df["price"]
     X_train, X_test, y_train, y_test = train_test_split(X, y, shuffle=False, test_size=0.2)
-    model = lgb.LGBMRegressor()
-    model.fit(X_train, y_train)
+    # The end of the training window is held out for early stopping, so the
+    # test set stays unseen
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, shuffle=False, test_size=0.1)
+    params = {
+        "objective": "regression_l2",
+        "num_threads": os.cpu_count(),
+        "force_col_wise": True,
+        "max_bin": 255,
+        "verbose": -1,
+    }
+    # Native Datasets over float32 arrays skip the DataFrame conversion in fit()
+    train_set = lgb.Dataset(X_fit.to_numpy(dtype=np.float32), label=y_fit.to_numpy(), free_raw_data=True)
+    valid_set = lgb.Dataset(X_val.to_numpy(dtype=np.float32), label=y_val.to_numpy(), reference=train_set)
+    model = lgb.train(
+        params,
+        train_set,
+        num_boost_round=300,
+        valid_sets=[valid_set],
+        callbacks=[lgb.early_stopping(20, verbose=False)],
+    )
     return model, X_test, y_test
 
 def evaluate_model(model, X_test, y_test):
@@ -50,12 +132,15 @@ def evaluate_model(model, X_test, y_test):
     return rmse, mae, y_test, y_pred
 
 def plot_predictions(y_test, y_pred):
-    plt.figure(figsize=(10, 5))
-    plt.plot(y_test.index, y_test, label="Actual")
-    plt.plot(y_test.index, y_pred, label="Predicted", linestyle="--")
-    plt.title("Actual vs Predicted Bitcoin Prices")
-    plt.xlabel("Time Index")
-    plt.ylabel("Price (USD)")
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
+    # WebGL traces keep long test sets responsive in the browser
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=y_test.index, y=y_test.to_numpy(), mode="lines", name="Actual"))
+    fig.add_trace(go.Scattergl(x=y_test.index, y=y_pred, mode="lines", name="Predicted", line=dict(dash="dash")))
+    fig.update_layout(
+        title="Actual vs Predicted Bitcoin Prices",
+        xaxis_title="Time Index",
+        yaxis_title="Price (USD)",
+        width=1000,
+        height=500,
+    )
+    fig.show()
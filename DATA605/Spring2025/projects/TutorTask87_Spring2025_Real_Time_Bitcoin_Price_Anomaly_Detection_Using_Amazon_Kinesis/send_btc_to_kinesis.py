@@ -1,22 +1,62 @@
 # send_btc_to_kinesis.py
 
-import time
-from utils.utils import fetch_bitcoin_price, send_to_kinesis
+import asyncio
+import aiohttp
+from utils.utils import buffer_record, fetch_bitcoin_price_async, flush_kinesis
 
 
 STREAM_NAME = "bitcoin-price-stream"
+POLL_INTERVAL = 10  # seconds between CoinGecko polls
+FLUSH_INTERVAL = 20  # seconds between Kinesis flushes
+MAX_BUFFERED = 400  # flush early once this many records are waiting
 
-def main():
-    print(f" Starting BTC price streaming to Kinesis: {STREAM_NAME}")
+
+async def produce_prices(session, queue):
+    """
+    Fetch the BTC price every POLL_INTERVAL seconds and queue it for sending.
+    """
+    loop = asyncio.get_running_loop()
+    next_poll = loop.time()
     while True:
         try:
-            btc_data = fetch_bitcoin_price()
+            btc_data = await fetch_bitcoin_price_async(session)
             print(" Fetched:", btc_data)
-            response = send_to_kinesis(STREAM_NAME, btc_data )
-            print(" Sent to Kinesis | Sequence #: ", response["SequenceNumber"])
+            await queue.put(btc_data)
         except Exception as e:
             print(" Error:", e)
-        time.sleep(10)
+        # polls stay on a fixed cadence however long the fetch took
+        next_poll += POLL_INTERVAL
+        await asyncio.sleep(max(0.0, next_poll - loop.time()))
+
+
+async def send_prices(queue):
+    """
+    Buffer queued prices and send them to Kinesis in batches, once
+    FLUSH_INTERVAL seconds have passed since the last flush or once
+    MAX_BUFFERED records are waiting.
+    """
+    loop = asyncio.get_running_loop()
+    last_flush = loop.time()
+    while True:
+        btc_data = await queue.get()
+        buffered = buffer_record(btc_data)
+        if loop.time() - last_flush < FLUSH_INTERVAL and buffered < MAX_BUFFERED:
+            continue
+        last_flush = loop.time()
+        try:
+            # boto3 is blocking, so the put runs in a worker thread
+            sent = await asyncio.to_thread(flush_kinesis, STREAM_NAME)
+            print(f" Sent {sent} records to Kinesis")
+        except Exception as e:
+            print(" Error:", e)
+
+
+async def main():
+    print(f" Starting BTC price streaming to Kinesis: {STREAM_NAME}")
+    queue = asyncio.Queue()
+    connector = aiohttp.TCPConnector(limit=10, keepalive_timeout=60)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(produce_prices(session, queue), send_prices(queue))
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -4,6 +4,7 @@ import boto3
 import json
 import requests
 from datetime import datetime
+from uuid import uuid4
 from dotenv import load_dotenv
 import os
 
@@ -16,9 +17,11 @@ aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
 region = os.getenv("AWS_DEFAULT_REGION")
 
 
+COINGECKO_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd&include_24hr_vol=true"
+
+
 # 1. Fetch real-time Bitcoin price
-def fetch_bitcoin_price(
-        api_url="https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd&include_24hr_vol=true"):
+def fetch_bitcoin_price(api_url=COINGECKO_PRICE_URL):
     """
     Fetch the current Bitcoin price and 24hr volume in USD from CoinGecko.
 
@@ -29,8 +32,26 @@ def fetch_bitcoin_price(
         dict: Bitcoin price and volume data with timestamp.
     """
     response = requests.get(api_url)
-    data = response.json()
+    return _parse_price(response.json())
+
+
+async def fetch_bitcoin_price_async(session, api_url=COINGECKO_PRICE_URL):
+    """
+    Fetch the current Bitcoin price like fetch_bitcoin_price, on an
+    aiohttp session that keeps its connection open between polls.
+
+    Args:
+        session (aiohttp.ClientSession): Session reused across polls.
+        api_url (str): CoinGecko API endpoint.
+
+    Returns:
+        dict: Bitcoin price and volume data with timestamp.
+    """
+    async with session.get(api_url) as response:
+        return _parse_price(await response.json())
+
 
+def _parse_price(data):
     price_usd = data["bitcoin"]["usd"]
     volume_usd = data["bitcoin"]["usd_24h_vol"]
     timestamp = datetime.utcnow().isoformat()
@@ -43,6 +64,22 @@ def fetch_bitcoin_price(
     }
 
 # 2. Send data to Kinesis Stream
+_kinesis_client = None
+
+
+def get_kinesis_client():
+    """
+    Return a Kinesis client shared by all sends, creating it on first use.
+
+    Returns:
+        botocore.client.Kinesis: Kinesis client.
+    """
+    global _kinesis_client
+    if _kinesis_client is None:
+        _kinesis_client = boto3.client('kinesis')
+    return _kinesis_client
+
+
 def send_to_kinesis(stream_name, data):
     """
     Send a single record (dict) to an AWS Kinesis Data Stream.
@@ -55,7 +92,7 @@ def send_to_kinesis(stream_name, data):
     Returns:
         dict: Response from Kinesis put_record API.
     """
-    kinesis_client = boto3.client('kinesis')
+    kinesis_client = get_kinesis_client()
 
     partition_key = "partitionKey"  # Can be random or fixed
 
@@ -67,6 +104,76 @@ def send_to_kinesis(stream_name, data):
 
     return response
 
+# Records waiting for the next flush_kinesis call; while Kinesis is unavailable
+# at most BUFFER_LIMIT are kept, dropping the oldest first
+BUFFER_LIMIT = 5000
+_buffer = []
+
+
+def _trim_buffer():
+    global _buffer
+    if len(_buffer) > BUFFER_LIMIT:
+        print(f" Buffer full, dropping the {len(_buffer) - BUFFER_LIMIT} oldest records")
+        _buffer = _buffer[-BUFFER_LIMIT:]
+
+
+def buffer_record(data):
+    """
+    Queue a record (dict) to be sent by the next flush_kinesis call.
+
+    Once BUFFER_LIMIT records are waiting, the oldest are dropped.
+
+    Args:
+        data (dict): Data to send.
+
+    Returns:
+        int: Number of buffered records.
+    """
+    _buffer.append(data)
+    _trim_buffer()
+    return len(_buffer)
+
+
+def flush_kinesis(stream_name, client=None):
+    """
+    Send all buffered records to an AWS Kinesis Data Stream in one put_records call.
+
+    Records Kinesis rejects (e.g. when throttled) stay buffered for the next flush.
+    Each record gets a random partition key so records spread over all shards.
+
+    Args:
+        stream_name (str): Name of the Kinesis stream.
+        client (botocore.client.Kinesis): Client to use; defaults to the shared one.
+
+    Returns:
+        int: Number of records sent.
+    """
+    global _buffer
+    if not _buffer:
+        return 0
+    client = client or get_kinesis_client()
+
+    # put_records accepts at most 500 records per call
+    batch, _buffer = _buffer[:500], _buffer[500:]
+    try:
+        response = client.put_records(
+            StreamName=stream_name,
+            Records=[
+                {"Data": json.dumps(data), "PartitionKey": uuid4().hex}
+                for data in batch
+            ]
+        )
+    except Exception:
+        _buffer = batch + _buffer
+        _trim_buffer()
+        raise
+
+    # results are in request order; re-queue the failed records
+    failed = [data for data, result in zip(batch, response["Records"]) if "ErrorCode" in result]
+    _buffer = failed + _buffer
+    _trim_buffer()
+    return len(batch) - len(failed)
+
 # 3. Utility - Get current UTC time (optional, useful later)
 def current_utc_time():
     """
@@ -15,6 +15,8 @@ from sklearn.model_selection import train_test_split
 #from pycaret.classification import compare_models
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 # -----------------------------------------------------------------------------
 # Logging
 # -----------------------------------------------------------------------------
@@ -64,31 +66,86 @@ def run_pycaret_classification(df: pd.DataFrame, target_column: str) -> pd.DataF
     return results
 
 
+#--------------------------------------------------------------------------------------
+# HTTP session and response cache
+#----------------------------------------------------------------------------------------
+
+# How long each endpoint's response is reused before it is revalidated with
+# its ETag / Last-Modified. River learns from every polled price, so the
+# price is never served from the cache without asking CoinGecko first.
+PRICE_CACHE_TTL = 0
+# get_bitcoin_price feeds a loop polling every 10 s, so a rate limit or
+# gateway error gets two short retries (at most a few seconds) and CoinGecko's
+# Retry-After, which can be minutes, is ignored; a step that still fails is
+# skipped by the loop
+_RETRY = Retry(
+    total=2,
+    backoff_factor=0.5,
+    backoff_max=2,
+    status_forcelist=(429, 502, 503, 504),
+    respect_retry_after_header=False,
+    # hand back the last error response so callers still see an HTTPError
+    raise_on_status=False,
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(max_retries=_RETRY, pool_connections=4, pool_maxsize=4))
+_cache = {}
+
+def _get_json(url: str, params: dict = None, ttl: float = 0):
+    """
+    GET a JSON endpoint through the shared session with a TTL + conditional GET cache.
+
+    :param url: endpoint URL
+    :param params: query parameters
+    :param ttl: seconds the response is served without revalidation, chosen by the caller
+
+    :return: the decoded JSON body
+    :raises requests.exceptions.HTTPError: for error responses
+    """
+    key = (url, tuple(sorted((params or {}).items())))
+    cached = _cache.get(key)
+    if cached and time.monotonic() < cached["expires"]:
+        return cached["data"]
+    headers = {}
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached["last_modified"]:
+        headers["If-Modified-Since"] = cached["last_modified"]
+    response = _SESSION.get(url, params=params, headers=headers, timeout=10)
+    if cached and response.status_code == 304:
+        cached["expires"] = time.monotonic() + ttl
+        return cached["data"]
+    response.raise_for_status()
+    _cache[key] = {
+        "data": response.json(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "expires": time.monotonic() + ttl,
+    }
+    return _cache[key]["data"]
+
 #--------------------------------------------------------------------------------------
 # Function to get bitcoin price 
 #----------------------------------------------------------------------------------------
 def get_bitcoin_price():
     """
     Fetch the current Bitcoin price in USD from the CoinGecko API.
+
+    Every call revalidates with CoinGecko (PRICE_CACHE_TTL is 0), so each
+    polling step sees the latest price; rate-limited requests are retried by
+    the session.
     :return: float or None if the API fails
     """
-    for attempt in range(3):  # retry logic
-        try:
-            response = requests.get(
-                "https://api.coingecko.com/api/v3/simple/price",
-                params={"ids": "bitcoin", "vs_currencies": "usd"}
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["bitcoin"]["usd"]
-        except requests.exceptions.HTTPError as e:
-            if response.status_code == 429:
-                logger.warning("Rate limit hit. Sleeping before retry...")
-                time.sleep(10)  # backoff time
-            else:
-                logger.warning(f"HTTP error occurred: {e}")
-                return None
-        except Exception as e:
-            logger.warning(f"Failed to fetch Bitcoin price: {e}")
-            return None
-    return None
+    try:
+        data = _get_json(
+            "https://api.coingecko.com/api/v3/simple/price",
+            params={"ids": "bitcoin", "vs_currencies": "usd"},
+            ttl=PRICE_CACHE_TTL,
+        )
+        return data["bitcoin"]["usd"]
+    except requests.exceptions.HTTPError as e:
+        logger.warning(f"HTTP error occurred: {e}")
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to fetch Bitcoin price: {e}")
+        return None
@@ -35,12 +35,16 @@ import os
 import time
 import logging
 import shlex
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import repeat
 from typing import List, Dict, Optional, Any, Tuple
 
 import requests
 import pandas as pd
 from statsmodels.tsa.arima.model import ARIMA
+from statsforecast import StatsForecast
+from statsforecast.models import AutoARIMA
 import matplotlib.pyplot as plt
 from config.settings import COINGECKO_PRICE_URL
 
@@ -262,17 +266,17 @@ def parse_local_json_data(local_json_path: str) -> Optional[pd.DataFrame]:
         _LOG.error("Local JSON file not found: %s", local_json_path)
         return None
     try:
-        records = []
-        with open(local_json_path, 'r') as f:
-            for line in f:
-                if line.strip():
-                    records.append(json.loads(line))
+        if os.path.getsize(local_json_path) == 0:
+             _LOG.warning("No records found in %s", local_json_path)
+             return None
 
-        if not records:
+        # Parse all lines in one C-level pass; type conversion is left to the
+        # explicit to_datetime/to_numeric calls below
+        pdf = pd.read_json(local_json_path, lines=True, dtype=False, convert_dates=False)
+        if pdf.empty:
              _LOG.warning("No records found in %s", local_json_path)
              return None
 
-        pdf = pd.DataFrame(records)
         pdf['timestamp'] = pd.to_datetime(pdf['timestamp'], errors='coerce')
         pdf['price'] = pd.to_numeric(pdf['price'], errors='coerce')
         pdf.dropna(subset=['timestamp', 'price'], inplace=True)
@@ -295,34 +299,76 @@ def parse_local_json_data(local_json_path: str) -> Optional[pd.DataFrame]:
         _LOG.error("Failed parsing local JSON data from %s: %s", local_json_path, e)
         return None
 
+def _series_freq(index: pd.DatetimeIndex):
+    """Inferred frequency of the index, or its median spacing if irregular."""
+    freq = pd.infer_freq(index) if len(index) >= 3 else None
+    return freq or pd.tseries.frequencies.to_offset(pd.Series(index).diff().median())
+
+def _train_autoarima(price_series: pd.Series) -> Tuple[StatsForecast, Tuple[int, int, int]]:
+    """Fits statsforecast's AutoARIMA and returns it with the selected (p, d, q)."""
+    sf = StatsForecast(models=[AutoARIMA(season_length=1)], freq=_series_freq(price_series.index))
+    sf.fit(pd.DataFrame({
+        'unique_id': 'btc',
+        'ds': price_series.index,
+        'y': price_series.to_numpy(dtype=float),
+    }))
+    model = sf.fitted_[0, 0].model_
+    # arma is (p, q, P, Q, season, d, D)
+    p, q, _, _, _, d, _ = model['arma']
+    order = (int(p), int(d), int(q))
+    _LOG.info("AutoARIMA selected order %s with AIC %.2f", order, model['aic'])
+    return sf, order
+
+def _fit_arima_order(order: Tuple[int, int, int], price_series: pd.Series) -> Tuple[Tuple[int, int, int], Any, Optional[str]]:
+    """Fits one statsmodels ARIMA order; returns (order, model_fit, None) or (order, None, error)."""
+    try:
+        return order, ARIMA(price_series, order=order).fit(), None
+    except Exception as e:
+        return order, None, str(e)
+
 def train_arima_model(price_series: pd.Series,
                       order_candidates: List[Tuple[int, int, int]] = [(1, 1, 1), (2, 1, 2), (0, 1, 1)],
-                      default_order: Tuple[int, int, int] = (1, 1, 1)
+                      default_order: Tuple[int, int, int] = (1, 1, 1),
+                      use_statsforecast: bool = True
                       ) -> Optional[Tuple[Any, Tuple[int, int, int]]]:
-    """Trains an ARIMA model, selecting the best order via AIC."""
+    """Trains an ARIMA model, selecting the best order via AIC.
+
+    By default statsforecast's AutoARIMA searches the orders itself, which is
+    much faster than fitting each candidate with statsmodels; the statsmodels
+    search over order_candidates is used when use_statsforecast is False or
+    AutoARIMA fails.
+    """
     if price_series.empty:
         _LOG.error("Cannot train ARIMA on empty series.")
         return None
     if not isinstance(price_series.index, pd.DatetimeIndex):
          _LOG.warning("Price series index is not DatetimeIndex.")
 
+    if use_statsforecast:
+        try:
+            return _train_autoarima(price_series)
+        except Exception as e:
+            _LOG.warning("AutoARIMA failed, falling back to statsmodels: %s", e)
+
     best_model_fit = None
     best_order = None
     best_aic = float('inf')
 
     _LOG.info("Fitting ARIMA models with orders: %s", order_candidates)
-    for order in order_candidates:
-        try:
-            model = ARIMA(price_series, order=order)
-            model_fit = model.fit()
-            aic = model_fit.aic
-            _LOG.info("Fitted ARIMA%s, AIC: %.2f", order, aic)
-            if aic < best_aic:
-                best_aic = aic
-                best_model_fit = model_fit
-                best_order = order
-        except Exception as e:
-            _LOG.warning("Failed fit ARIMA%s: %s", order, e)
+    # The candidate fits are independent and CPU-bound, so run them in parallel
+    workers = min(len(order_candidates), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_fit_arima_order, order_candidates, repeat(price_series)))
+    for order, model_fit, error in results:
+        if model_fit is None:
+            _LOG.warning("Failed fit ARIMA%s: %s", order, error)
+            continue
+        aic = model_fit.aic
+        _LOG.info("Fitted ARIMA%s, AIC: %.2f", order, aic)
+        if aic < best_aic:
+            best_aic = aic
+            best_model_fit = model_fit
+            best_order = order
 
     if best_model_fit:
         _LOG.info("Selected ARIMA order %s with AIC %.2f", best_order, best_aic)
@@ -342,6 +388,18 @@ def train_arima_model(price_series: pd.Series,
 def get_forecast(model_fit, steps: int = 10) -> Optional[pd.DataFrame]:
     """Generates forecasts from a fitted ARIMA model."""
     try:
+        if isinstance(model_fit, StatsForecast):
+            predictions = model_fit.predict(h=steps, level=[95])
+            forecast_df = pd.DataFrame({
+                'timestamp': predictions['ds'].values,
+                'forecast': predictions['AutoARIMA'].values,
+                'lower_ci': predictions['AutoARIMA-lo-95'].values,
+                'upper_ci': predictions['AutoARIMA-hi-95'].values
+            })
+            forecast_df.set_index('timestamp', inplace=True)
+            _LOG.info("Generated forecast for %d steps.", steps)
+            return forecast_df
+
         forecast_result = model_fit.get_forecast(steps=steps)
         forecast_mean = forecast_result.predicted_mean
         conf_int = forecast_result.conf_int(alpha=0.05)